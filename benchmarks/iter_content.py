@@ -0,0 +1,39 @@
+"""
+Measure `Response.iter_content()` throughput for a range of chunk sizes,
+using an in-memory stream so that only the rechunking cost is timed.
+
+    $ python benchmarks/iter_content.py --size 1G
+"""
+
+import argparse
+import asyncio
+import time
+
+from read import build_response, parse_size
+
+CHUNK_SIZES = [None, 1024, 4096, 65536, 1024**2]
+
+
+async def time_iter_content(size, chunk_size):
+    response = build_response(size)
+    received = 0
+    start = time.perf_counter()
+    async for chunk in response.iter_content(chunk_size=chunk_size):
+        received += len(chunk)
+    elapsed = time.perf_counter() - start
+    assert received == size
+    return elapsed
+
+
+async def main(size):
+    print(f"{'chunk_size':>12} {'MB/s':>12}")
+    for chunk_size in CHUNK_SIZES:
+        elapsed = await time_iter_content(size, chunk_size)
+        print(f"{str(chunk_size):>12} {size / 1024 ** 2 / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="1G", type=parse_size)
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args.size))
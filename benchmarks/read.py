@@ -0,0 +1,82 @@
+"""
+Measure `Response.read()` and `Response.readinto()` throughput across body
+sizes, using an in-memory stream so that only the accumulation cost is timed.
+
+Throughput should stay roughly flat as the body size grows.
+
+    $ python benchmarks/read.py --max-size 1G
+"""
+
+import argparse
+import asyncio
+import time
+
+import http3
+import requests
+
+from requests_async.adapters import HTTPAdapter
+
+NETWORK_CHUNK_SIZE = 4096
+
+
+def parse_size(value):
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    if value[-1].upper() in units:
+        return int(value[:-1]) * units[value[-1].upper()]
+    return int(value)
+
+
+def build_response(size):
+    chunk = b"x" * NETWORK_CHUNK_SIZE
+
+    async def stream():
+        remaining = size
+        while remaining > 0:
+            yield chunk[: min(remaining, NETWORK_CHUNK_SIZE)]
+            remaining -= NETWORK_CHUNK_SIZE
+
+    request = requests.Request("GET", "http://example.org/").prepare()
+    raw = http3.AsyncResponse(
+        200, headers=[(b"content-length", str(size).encode())], content=stream()
+    )
+    return HTTPAdapter().build_response(request, raw)
+
+
+async def time_read(size):
+    response = build_response(size)
+    start = time.perf_counter()
+    content = await response.read()
+    elapsed = time.perf_counter() - start
+    assert len(content) == size
+    return elapsed
+
+
+async def time_readinto(size):
+    response = build_response(size)
+    buffer = bytearray(size)
+    start = time.perf_counter()
+    count = await response.readinto(buffer)
+    elapsed = time.perf_counter() - start
+    assert count == size
+    return elapsed
+
+
+async def main(max_size):
+    print(f"{'size':>12} {'read MB/s':>12} {'readinto MB/s':>14}")
+    size = 1024
+    while size <= max_size:
+        read_elapsed = await time_read(size)
+        readinto_elapsed = await time_readinto(size)
+        megabytes = size / 1024**2
+        print(
+            f"{size:>12} {megabytes / read_elapsed:>12.1f} "
+            f"{megabytes / readinto_elapsed:>14.1f}"
+        )
+        size *= 4
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-size", default="1G", type=parse_size)
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args.max_size))
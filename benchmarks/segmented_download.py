@@ -0,0 +1,114 @@
+"""
+Compare `Session.download()` with different numbers of segments, against a
+local server that limits the throughput of each connection.
+
+With a per-connection limit, throughput should grow with the number of
+segments until the client or the disk becomes the bottleneck.
+
+    $ python benchmarks/segmented_download.py --size 64M --rate 8M
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import requests_async
+from read import parse_size
+
+SEGMENTS = [1, 2, 4, 8]
+SEND_CHUNK_SIZE = 64 * 1024
+
+
+class ThrottledServer:
+    """
+    Serves `size` bytes, with support for `Range` requests, sending at most
+    `rate` bytes per second on each connection.
+    """
+
+    def __init__(self, size, rate):
+        self.content = os.urandom(1024 * 1024) * (size // (1024 * 1024)) + os.urandom(
+            size % (1024 * 1024)
+        )
+        self.rate = rate
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.decode("latin1").split("\r\n")
+                method = lines[0].split(" ")[0]
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        key, value = line.split(":", 1)
+                        headers[key.lower()] = value.strip()
+
+                start, end = 0, len(self.content) - 1
+                status = "200 OK"
+                extra = ""
+                if "range" in headers:
+                    first, last = headers["range"][len("bytes=") :].split("-")
+                    start = int(first)
+                    end = int(last) if last else end
+                    status = "206 Partial Content"
+                    extra = "Content-Range: bytes %d-%d/%d\r\n" % (
+                        start,
+                        end,
+                        len(self.content),
+                    )
+                writer.write(
+                    (
+                        "HTTP/1.1 %s\r\nContent-Length: %d\r\nAccept-Ranges: bytes\r\n"
+                        'ETag: "benchmark"\r\n%s\r\n' % (status, end - start + 1, extra)
+                    ).encode("latin1")
+                )
+                if method != "HEAD":
+                    await self.send(writer, memoryview(self.content)[start : end + 1])
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def send(self, writer, data):
+        started = time.perf_counter()
+        for offset in range(0, len(data), SEND_CHUNK_SIZE):
+            writer.write(data[offset : offset + SEND_CHUNK_SIZE])
+            await writer.drain()
+            delay = (offset + SEND_CHUNK_SIZE) / self.rate - (
+                time.perf_counter() - started
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+async def main(size, rate):
+    server = ThrottledServer(size, rate)
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 8003)
+    url = "http://127.0.0.1:8003/file"
+    print(f"{'segments':>10} {'MB/s':>12}")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file")
+            for segments in SEGMENTS:
+                async with requests_async.Session() as session:
+                    start = time.perf_counter()
+                    await session.download(url, path, resume=False, segments=segments)
+                    elapsed = time.perf_counter() - start
+                assert os.path.getsize(path) == size
+                print(f"{segments:>10} {size / 1024 ** 2 / elapsed:>12.1f}")
+                os.remove(path)
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="64M", type=parse_size)
+    parser.add_argument("--rate", default="8M", type=parse_size)
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args.size, args.rate))
@@ -1,11 +1,14 @@
 from .adapters import HTTPAdapter
 from .api import delete, get, head, options, patch, post, put, request
 from .asgi import ASGISession
+from .caching import CachingAdapter, ResponseCache
 from .exceptions import (
+    ConnectError,
     ConnectionError,
     ConnectTimeout,
     FileModeWarning,
     HTTPError,
+    PoolTimeout,
     ReadTimeout,
     RequestException,
     Timeout,
@@ -13,6 +16,8 @@ from .exceptions import (
     URLRequired,
 )
 from .models import PreparedRequest, Request, Response
+from .resolver import Resolver
+from .retries import Retry, RetryBudget
 from .sessions import Session
 from .status_codes import codes
 
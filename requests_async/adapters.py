@@ -1,5 +1,6 @@
 import asyncio
 import io
+import mmap
 import os
 import socket
 import ssl
@@ -10,32 +11,158 @@ from urllib.parse import urlparse
 import h11
 import requests
 import urllib3
+from requests.auth import _basic_auth_str
+from requests.utils import (
+    get_auth_from_url,
+    prepend_scheme_if_needed,
+    rewind_body,
+    select_proxy,
+    should_bypass_proxies,
+)
 
 import http3
 
+from .backends import AsyncioBackend
 from .cookies import extract_cookies_to_jar
-from .exceptions import ConnectionError, ConnectTimeout, ReadTimeout
-from .models import Response
+from .exceptions import (
+    ConnectError,
+    ConnectionError,
+    ConnectTimeout,
+    InvalidProxyURL,
+    PoolTimeout,
+    ProxyError,
+    ReadTimeout,
+)
+from .models import Response, stream_body
+from .pool import ConnectionPool
+from .proxies import ProxyConnectionPool
+from .retries import Retry, RetryBudget
+
+DEFAULT_POOLSIZE = 10
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_POOL_TIMEOUT = 5.0
 
 
 class HTTPAdapter:
-    def __init__(self):
-        self.pool = http3.ConnectionPool()
+    """
+    The built-in HTTP adapter, which sends requests using an `http3`
+    connection pool.
+
+    :param pool_connections: The number of idle connections to keep alive
+        across all hosts.
+    :param pool_maxsize: The number of idle connections to keep alive for
+        any single host.
+    :param max_connections: The maximum number of open connections across all
+        hosts.
+    :param max_connections_per_host: The maximum number of open connections to
+        any single host, or `None` for no per-host limit.
+    :param pool_timeout: How long to wait for a connection to become
+        available before raising `PoolTimeout`.
+    :param keepalive_expiry: Close connections that have been idle for more
+        than this many seconds.
+    :param max_connection_age: Close connections that have been open for more
+        than this many seconds, less up to 10% random jitter.
+    :param resolver: A `Resolver` instance to look up hostnames with, instead
+        of the event loop's default `getaddrinfo`.
+    :param max_retries: The maximum number of retries for each request, or a
+        `Retry` instance for finer control.
+    :param retry_budget: A `RetryBudget` shared by all requests through this
+        adapter. Defaults to allowing retries for 20% of requests.
+    """
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=DEFAULT_POOLSIZE,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_connections_per_host=None,
+        pool_timeout=DEFAULT_POOL_TIMEOUT,
+        keepalive_expiry=None,
+        max_connection_age=None,
+        resolver=None,
+        max_retries=0,
+        retry_budget=None,
+    ):
+        self.max_retries = Retry.from_int(max_retries)
+        self.retry_budget = RetryBudget() if retry_budget is None else retry_budget
+        pool_limits = http3.PoolLimits(
+            soft_limit=pool_connections,
+            hard_limit=max_connections,
+            pool_timeout=pool_timeout,
+        )
+        self.pool_kwargs = dict(
+            pool_limits=pool_limits,
+            max_connections_per_host=max_connections_per_host,
+            max_keepalive_per_host=pool_maxsize,
+            keepalive_expiry=keepalive_expiry,
+            max_connection_age=max_connection_age,
+            backend=AsyncioBackend(resolver=resolver),
+        )
+        self.pool = ConnectionPool(**self.pool_kwargs)
+        self.proxy_pools = {}  # type: typing.Dict[str, ProxyConnectionPool]
 
     async def send(
         self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
     ) -> Response:
+        retries = self.max_retries
+        if retries.total:
+            self.retry_budget.deposit()
 
+        attempt = 0
+        while True:
+            can_retry = attempt < retries.total and is_replayable(request)
+            try:
+                response = await self._send(
+                    request, stream, timeout, verify, cert, proxies
+                )
+            except (ConnectTimeout, ConnectionError, ReadTimeout) as exc:
+                # A request that failed to connect never reached the server, so
+                # is safe to retry whatever its method.
+                if not can_retry or (
+                    not isinstance(exc, (ConnectError, ConnectTimeout))
+                    and not retries.is_method_retryable(request.method)
+                ):
+                    raise
+                if not self.retry_budget.withdraw():
+                    raise
+                delay = retries.get_backoff_time(attempt)
+            else:
+                retry_after = retries.get_retry_after(response.headers)
+                if not (
+                    can_retry
+                    and retries.is_retry(
+                        request.method, response.status_code, retry_after is not None
+                    )
+                    and self.retry_budget.withdraw()
+                ):
+                    return response
+                await response.close()
+                if retry_after is None:
+                    delay = retries.get_backoff_time(attempt)
+                else:
+                    delay = retry_after
+
+            attempt += 1
+            if getattr(request, "_body_position", None) is not None:
+                rewind_body(request)
+            await asyncio.sleep(delay)
+
+    async def _send(self, request, stream, timeout, verify, cert, proxies):
         method = request.method
         url = request.url
+        if isinstance(request.body, memoryview) and "Content-Length" in request.headers:
+            # `requests` counts the elements of a buffer, rather than its bytes.
+            request.headers["Content-Length"] = str(request.body.nbytes)
         headers = [(_encode(k), _encode(v)) for k, v in request.headers.items()]
 
         if not request.body:
             body = b""
         elif isinstance(request.body, str):
             body = _encode(request.body)
-        else:
+        elif isinstance(request.body, bytes):
             body = request.body
+        else:
+            body = stream_body(request.body)
 
         if isinstance(timeout, tuple):
             timeout_kwargs = {"connect_timeout": timeout[0], "read_timeout": timeout[1]}
@@ -44,8 +171,9 @@ class HTTPAdapter:
 
         timeout = http3.TimeoutConfig(**timeout_kwargs)
 
+        pool = self.get_pool(url, proxies)
         try:
-            response = await self.pool.request(
+            response = await pool.request(
                 method,
                 url,
                 headers=headers,
@@ -54,20 +182,64 @@ class HTTPAdapter:
                 verify=verify,
                 timeout=timeout,
             )
-        except socket.error as err:
+        except ProxyError as err:
+            raise ProxyError(err, request=request)
+        except ConnectError as err:
+            raise ConnectError(err, request=request)
+        except (socket.error, h11.ProtocolError) as err:
             raise ConnectionError(err, request=request)
         except http3.ConnectTimeout as err:
             raise ConnectTimeout(err, request=request)
         except http3.ReadTimeout as err:
             raise ReadTimeout(err, request=request)
+        except http3.PoolTimeout as err:
+            raise PoolTimeout(err, request=request)
 
         if not stream:
             await response.read()
 
         return self.build_response(request, response)
 
+    def get_pool(self, url, proxies=None) -> ConnectionPool:
+        """
+        Return the connection pool to send a request to the given URL with,
+        which is a pool of proxy connections if a proxy applies to the URL.
+        """
+        proxy = select_proxy(url, proxies or {})
+        if proxy is None or should_bypass_proxies(
+            url, no_proxy=proxies.get("no_proxy")
+        ):
+            return self.pool
+
+        proxy = prepend_scheme_if_needed(proxy, "http")
+        if proxy not in self.proxy_pools:
+            if urlparse(proxy).scheme.lower() != "http":
+                raise InvalidProxyURL("Only http:// proxies are supported: %r" % proxy)
+            self.proxy_pools[proxy] = ProxyConnectionPool(
+                proxy, proxy_headers=self.proxy_headers(proxy), **self.pool_kwargs
+            )
+        return self.proxy_pools[proxy]
+
+    def proxy_headers(self, proxy):
+        """Returns a dictionary of the headers to add to any request sent
+        through a proxy, or to the `CONNECT` request that opens a tunnel.
+
+        :param proxy: The url of the proxy being used for this request.
+        :rtype: dict
+        """
+        headers = {}
+        username, password = get_auth_from_url(proxy)
+        if username:
+            headers["Proxy-Authorization"] = _basic_auth_str(username, password)
+        return headers
+
     async def close(self):
         await self.pool.close()
+        for pool in self.proxy_pools.values():
+            await pool.close()
+
+    def stats(self) -> dict:
+        return self.pool.stats()
 
     def build_response(self, req, resp):
         """Builds a :class:`Response <requests.Response>` object from an http3
@@ -113,3 +285,14 @@ class HTTPAdapter:
         response.raw = resp
 
         return response
+
+
+def is_replayable(request) -> bool:
+    """
+    Return `True` if the request body can be sent again. File-like bodies
+    can be rewound to where they started, but iterators can't.
+    """
+    body = request.body
+    if body is None or isinstance(body, (str, bytes, bytearray, memoryview, mmap.mmap)):
+        return True
+    return isinstance(getattr(request, "_body_position", None), int)
@@ -0,0 +1,178 @@
+import asyncio
+import socket
+import ssl
+import typing
+
+import http3
+from http3.concurrency import Reader, Writer
+from http3.interfaces import Protocol
+
+from .exceptions import ConnectError, ProxyError
+
+# The largest response to a `CONNECT` request that we'll accept.
+MAX_TUNNEL_RESPONSE_SIZE = 64 * 1024
+
+
+class AsyncioBackend(http3.AsyncioBackend):
+    """
+    An `http3.AsyncioBackend` that can look up hostnames with a `Resolver`,
+    rather than with the event loop's default `getaddrinfo`, and that can
+    open connections through an HTTP proxy tunnel.
+    """
+
+    def __init__(self, resolver=None) -> None:
+        super(AsyncioBackend, self).__init__()
+        self.resolver = resolver
+
+    async def connect(
+        self,
+        hostname: str,
+        port: int,
+        ssl_context: typing.Optional[ssl.SSLContext],
+        timeout: http3.TimeoutConfig,
+    ) -> typing.Tuple[Reader, Writer, Protocol]:
+        return await self._connect(
+            self.open_connection(hostname, port, ssl_context), timeout
+        )
+
+    async def connect_tunnel(
+        self,
+        proxy_hostname: str,
+        proxy_port: int,
+        hostname: str,
+        port: int,
+        ssl_context: typing.Optional[ssl.SSLContext],
+        timeout: http3.TimeoutConfig,
+        proxy_headers: typing.Dict[str, str] = None,
+    ) -> typing.Tuple[Reader, Writer, Protocol]:
+        """
+        Connect to a host through an HTTP proxy, using a `CONNECT` tunnel.
+        """
+        return await self._connect(
+            self.open_tunnel(
+                proxy_hostname, proxy_port, hostname, port, ssl_context, proxy_headers
+            ),
+            timeout,
+        )
+
+    async def _connect(
+        self, opening: typing.Awaitable, timeout: http3.TimeoutConfig
+    ) -> typing.Tuple[Reader, Writer, Protocol]:
+        try:
+            stream_reader, stream_writer = await asyncio.wait_for(
+                opening, timeout.connect_timeout
+            )
+        except asyncio.TimeoutError:
+            raise http3.ConnectTimeout()
+        except ProxyError:
+            raise
+        except OSError as exc:
+            raise ConnectError(exc)
+
+        ssl_object = stream_writer.get_extra_info("ssl_object")
+        if ssl_object is None:
+            ident = "http/1.1"
+        else:
+            ident = ssl_object.selected_alpn_protocol()
+            if ident is None:
+                ident = ssl_object.selected_npn_protocol()
+
+        reader = Reader(stream_reader=stream_reader, timeout=timeout)
+        writer = Writer(stream_writer=stream_writer, timeout=timeout)
+        protocol = Protocol.HTTP_2 if ident == "h2" else Protocol.HTTP_11
+
+        return (reader, writer, protocol)
+
+    async def open_connection(
+        self, hostname: str, port: int, ssl_context: typing.Optional[ssl.SSLContext]
+    ) -> typing.Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self.resolver is None:
+            return await asyncio.open_connection(hostname, port, ssl=ssl_context)
+
+        server_hostname = hostname if ssl_context is not None else None
+        addresses = await self.resolver.resolve(hostname)
+        for index, (family, address) in enumerate(addresses):
+            try:
+                return await asyncio.open_connection(
+                    address,
+                    port,
+                    ssl=ssl_context,
+                    family=family,
+                    server_hostname=server_hostname,
+                )
+            except OSError:
+                # Try each address in turn, raising the last error.
+                if index == len(addresses) - 1:
+                    raise
+        raise OSError("No addresses found for %r." % hostname)
+
+    async def open_tunnel(
+        self,
+        proxy_hostname: str,
+        proxy_port: int,
+        hostname: str,
+        port: int,
+        ssl_context: typing.Optional[ssl.SSLContext],
+        proxy_headers: typing.Dict[str, str] = None,
+    ) -> typing.Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        loop = asyncio.get_event_loop()
+        sock = await self.open_socket(proxy_hostname, proxy_port)
+        try:
+            authority = "[%s]:%d" % (hostname, port) if ":" in hostname else None
+            authority = authority or "%s:%d" % (hostname, port)
+            lines = ["CONNECT %s HTTP/1.1" % authority, "Host: %s" % authority]
+            for key, value in (proxy_headers or {}).items():
+                lines.append("%s: %s" % (key, value))
+            request = "\r\n".join(lines) + "\r\n\r\n"
+            await loop.sock_sendall(sock, request.encode("latin1"))
+
+            # Read the response a byte at a time, so that nothing from the
+            # tunnelled connection is consumed along with it.
+            response = bytearray()
+            while not response.endswith(b"\r\n\r\n"):
+                data = await loop.sock_recv(sock, 1)
+                if not data:
+                    raise ProxyError("The proxy closed the connection.")
+                response += data
+                if len(response) > MAX_TUNNEL_RESPONSE_SIZE:
+                    raise ProxyError("The proxy sent an oversized response.")
+
+            status_line = bytes(response).split(b"\r\n", 1)[0].decode("latin1")
+            parts = status_line.split(None, 2)
+            if len(parts) < 2 or not parts[1].startswith("2"):
+                raise ProxyError("Tunnel connection failed: %s" % status_line)
+
+            return await asyncio.open_connection(
+                sock=sock,
+                ssl=ssl_context,
+                server_hostname=hostname if ssl_context is not None else None,
+            )
+        except BaseException:
+            sock.close()
+            raise
+
+    async def open_socket(self, hostname: str, port: int) -> socket.socket:
+        """
+        Open a non-blocking TCP socket, trying each address for the hostname
+        in turn.
+        """
+        loop = asyncio.get_event_loop()
+        if self.resolver is None:
+            infos = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+            addresses = [(family, sockaddr[0]) for family, _, _, _, sockaddr in infos]
+        else:
+            addresses = await self.resolver.resolve(hostname)
+
+        for index, (family, address) in enumerate(addresses):
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                await loop.sock_connect(sock, (address, port))
+            except OSError:
+                sock.close()
+                if index == len(addresses) - 1:
+                    raise
+            else:
+                return sock
+        raise OSError("No addresses found for %r." % hostname)
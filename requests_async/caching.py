@@ -0,0 +1,339 @@
+import calendar
+import collections
+import email.utils
+import time
+import typing
+
+import http3
+import requests
+
+from .adapters import HTTPAdapter
+from .models import Response
+
+# Status codes that may be cached without explicit freshness information.
+# See RFC 7231, Section 6.1.
+CACHEABLE_STATUS_CODES = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
+
+CONDITIONAL_HEADERS = (
+    "if-match",
+    "if-none-match",
+    "if-modified-since",
+    "if-unmodified-since",
+    "if-range",
+    "range",
+)
+
+# Heuristic freshness, as a fraction of the time since `Last-Modified`.
+# See RFC 7234, Section 4.2.2.
+HEURISTIC_FRACTION = 0.1
+MAX_HEURISTIC_LIFETIME = 24 * 60 * 60
+
+DEFAULT_CACHE_SIZE = 16 * 1024 * 1024
+
+
+def parse_cache_control(value: typing.Optional[str]) -> typing.Dict[str, str]:
+    directives = {}
+    for directive in (value or "").split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"')
+    return directives
+
+
+def parse_http_date(value: typing.Optional[str]) -> typing.Optional[float]:
+    try:
+        parsed = email.utils.parsedate(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return calendar.timegm(parsed)
+
+
+def parse_seconds(value: typing.Optional[str]) -> typing.Optional[int]:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheEntry:
+    def __init__(self, response: Response) -> None:
+        self.status_code = response.status_code
+        self.reason = response.reason
+        self.encoding = response.encoding
+        self.content = response.content
+        self.headers = requests.structures.CaseInsensitiveDict(response.headers)
+        self.url = response.url
+        self.stored_at = time.time()
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(
+            len(key) + len(value) for key, value in self.headers.items()
+        )
+
+    @property
+    def validators(self) -> typing.Dict[str, str]:
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def age(self, now: float) -> float:
+        """
+        The current age of the entry. See RFC 7234, Section 4.2.3.
+        """
+        date = parse_http_date(self.headers.get("date"))
+        apparent_age = 0.0 if date is None else max(0.0, self.stored_at - date)
+        age = parse_seconds(self.headers.get("age")) or 0
+        return max(apparent_age, age) + (now - self.stored_at)
+
+    def freshness_lifetime(self) -> float:
+        """
+        How long the entry is fresh for. See RFC 7234, Section 4.2.1.
+        """
+        cache_control = parse_cache_control(self.headers.get("cache-control"))
+        if "max-age" in cache_control:
+            return parse_seconds(cache_control["max-age"]) or 0
+
+        date = parse_http_date(self.headers.get("date")) or self.stored_at
+        if "expires" in self.headers:
+            expires = parse_http_date(self.headers["expires"])
+            return 0 if expires is None else max(0, expires - date)
+
+        last_modified = parse_http_date(self.headers.get("last-modified"))
+        if last_modified is not None and self.status_code in CACHEABLE_STATUS_CODES:
+            lifetime = (date - last_modified) * HEURISTIC_FRACTION
+            return min(max(0, lifetime), MAX_HEURISTIC_LIFETIME)
+        return 0
+
+    def is_fresh(self, now: float) -> bool:
+        cache_control = parse_cache_control(self.headers.get("cache-control"))
+        if "no-cache" in cache_control:
+            return False
+        return self.age(now) < self.freshness_lifetime()
+
+    def update(self, response: Response) -> None:
+        """
+        Freshen the entry with the headers from a `304 Not Modified` response.
+        """
+        for key, value in response.headers.items():
+            if key.lower() not in ("content-length", "transfer-encoding"):
+                self.headers[key] = value
+        self.stored_at = time.time()
+
+
+class ResponseCache:
+    """
+    An in-memory store of responses, evicted least-recently-used first once
+    the total size of the stored responses exceeds `max_size` bytes.
+
+    Keeps counts of cache `hits`, `misses`, and `revalidations` of stale
+    responses.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.entries = collections.OrderedDict()  # type: typing.Dict[tuple, CacheEntry]
+        self.vary = {}  # type: typing.Dict[tuple, typing.Tuple[str, ...]]
+        self.keys_by_url = {}  # type: typing.Dict[str, typing.Set[tuple]]
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def key(self, request: requests.PreparedRequest) -> tuple:
+        vary = self.vary.get((request.method, request.url), ())
+        values = tuple(request.headers.get(name) for name in vary)
+        return (request.method, request.url, values)
+
+    def get(self, request: requests.PreparedRequest) -> typing.Optional[CacheEntry]:
+        key = self.key(request)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(
+        self,
+        request: requests.PreparedRequest,
+        entry: CacheEntry,
+        vary: typing.Tuple[str, ...] = (),
+    ) -> None:
+        self.delete(request)
+        if entry.size > self.max_size:
+            return
+
+        self.vary[(request.method, request.url)] = vary
+        key = self.key(request)
+        self.entries[key] = entry
+        self.keys_by_url.setdefault(request.url, set()).add(key)
+        self.size += entry.size
+        while self.size > self.max_size:
+            self.remove(next(iter(self.entries)))
+
+    def delete(self, request: requests.PreparedRequest) -> None:
+        key = self.key(request)
+        if key in self.entries:
+            self.remove(key)
+
+    def invalidate(self, url: str) -> None:
+        """
+        Remove all stored responses for the given URL.
+        """
+        for key in list(self.keys_by_url.get(url, ())):
+            self.remove(key)
+
+    def remove(self, key: tuple) -> None:
+        self.size -= self.entries.pop(key).size
+        keys = self.keys_by_url[key[1]]
+        keys.discard(key)
+        if not keys:
+            del self.keys_by_url[key[1]]
+            self.vary.pop((key[0], key[1]), None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.vary.clear()
+        self.keys_by_url.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    An `HTTPAdapter` that caches responses to `GET` requests in memory,
+    following the HTTP caching rules in RFC 7234.
+
+    Fresh responses are returned without any network I/O, and stale responses
+    are revalidated with a conditional request. Any other keyword arguments
+    are passed on to `HTTPAdapter`.
+    """
+
+    def __init__(self, cache: ResponseCache = None, **kwargs: typing.Any) -> None:
+        super(CachingAdapter, self).__init__(**kwargs)
+        self.cache = ResponseCache() if cache is None else cache
+
+    async def send(self, request, stream=False, **kwargs):
+        if request.method not in SAFE_METHODS:
+            response = await super(CachingAdapter, self).send(
+                request, stream=stream, **kwargs
+            )
+            if response.status_code < 400:
+                self.cache.invalidate(request.url)
+            return response
+
+        request_cache_control = parse_cache_control(
+            request.headers.get("cache-control")
+        )
+        if (
+            request.method != "GET"
+            or "no-store" in request_cache_control
+            or any(name in request.headers for name in CONDITIONAL_HEADERS)
+        ):
+            # Conditional and range requests are the caller's own business,
+            # and their responses don't represent the whole resource.
+            return await super(CachingAdapter, self).send(
+                request, stream=stream, **kwargs
+            )
+
+        entry = self.cache.get(request)
+        if entry is not None:
+            no_cache = (
+                "no-cache" in request_cache_control
+                or request_cache_control.get("max-age") == "0"
+                or request.headers.get("pragma") == "no-cache"
+            )
+            if not no_cache and entry.is_fresh(time.time()):
+                self.cache.hits += 1
+                return self.build_cached_response(request, entry)
+
+            validators = entry.validators
+            if validators:
+                conditional = request.copy()
+                conditional.headers.update(validators)
+                response = await super(CachingAdapter, self).send(
+                    conditional, stream=stream, **kwargs
+                )
+                if response.status_code == 304:
+                    await response.close()
+                    self.cache.revalidations += 1
+                    entry.update(response)
+                    return self.build_cached_response(request, entry)
+                self.cache.misses += 1
+                self.store(request, response, stream)
+                return response
+
+        self.cache.misses += 1
+        response = await super(CachingAdapter, self).send(
+            request, stream=stream, **kwargs
+        )
+        self.store(request, response, stream)
+        return response
+
+    def store(self, request, response, stream):
+        if stream or response._content is False:
+            return
+
+        cache_control = parse_cache_control(response.headers.get("cache-control"))
+        vary = tuple(
+            name.strip().lower()
+            for name in response.headers.get("vary", "").split(",")
+            if name.strip()
+        )
+        if (
+            "no-store" in cache_control
+            or "*" in vary
+            or response.status_code in (206, 304)
+        ):
+            self.cache.delete(request)
+            return
+
+        # Responses with other status codes may only be cached if they have
+        # explicit freshness information. See RFC 7234, Section 3.
+        explicit = "max-age" in cache_control or "expires" in response.headers
+        if response.status_code not in CACHEABLE_STATUS_CODES and not explicit:
+            return
+
+        entry = CacheEntry(response)
+        if entry.freshness_lifetime() > 0 or entry.validators:
+            self.cache.set(request, entry, vary)
+
+    def build_cached_response(self, req, entry):
+        response = Response()
+        response.status_code = entry.status_code
+        response.reason = entry.reason
+        response.encoding = entry.encoding
+        response.headers = requests.structures.CaseInsensitiveDict(entry.headers)
+        response.headers["Age"] = str(int(entry.age(time.time())))
+        response._content = entry.content
+        response._content_consumed = True
+        response.url = entry.url
+        response.request = req
+        response.connection = self
+        response.raw = http3.AsyncResponse(
+            entry.status_code,
+            headers=[
+                (key.encode("latin1"), value.encode("latin1"))
+                for key, value in entry.headers.items()
+            ],
+        )
+        return response
+
+    def stats(self) -> dict:
+        stats = super(CachingAdapter, self).stats()
+        stats["cache"] = self.cache.stats()
+        return stats
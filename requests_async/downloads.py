@@ -0,0 +1,255 @@
+import asyncio
+import json
+import os
+import re
+import typing
+
+from .exceptions import ConnectionError, Timeout
+
+# Segmented downloads split the file into ranges no smaller than this.
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+# How many times each segment of a segmented download is retried.
+SEGMENT_RETRIES = 3
+
+
+class RangesNotSupported(Exception):
+    """The server responded to a range request with the whole file."""
+
+
+# Matches `Content-Range` headers, such as "bytes 0-99/1000" or "bytes */1000".
+CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)")
+
+
+def _validator(headers: typing.Mapping[str, str]) -> typing.Optional[str]:
+    """
+    Return a validator that may be sent in `If-Range`, which requires a
+    strong `ETag`, or else a `Last-Modified` date.
+    """
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+    return headers.get("last-modified")
+
+
+def _content_range(headers) -> typing.Tuple[typing.Optional[int], typing.Optional[int]]:
+    match = CONTENT_RANGE.fullmatch(headers.get("content-range", "").strip())
+    if match is None:
+        return (None, None)
+    start, total = match.groups()
+    return (
+        None if start is None else int(start),
+        None if total == "*" else int(total),
+    )
+
+
+def _partial_state(part_path: str, meta_path: str, url: str) -> tuple:
+    """
+    Return the size of a partial download, and the validator for it, or
+    `(0, None)` if it can't be resumed.
+    """
+    try:
+        with open(meta_path) as file:
+            meta = json.load(file)
+        size = os.path.getsize(part_path)
+    except (OSError, ValueError):
+        return (0, None)
+    if meta.get("url") != url or not meta.get("validator"):
+        return (0, None)
+    return (size, meta["validator"])
+
+
+def _save_meta(meta_path: str, url: str, validator: typing.Optional[str]) -> None:
+    if validator is None:
+        _remove(meta_path)
+        return
+    with open(meta_path, "w") as file:
+        json.dump({"url": url, "validator": validator}, file)
+
+
+def _finish(part_path: str, meta_path: str, path: str) -> None:
+    os.replace(part_path, path)
+    _remove(meta_path)
+
+
+def _preallocate(path: str, size: int) -> None:
+    with open(path, "wb") as file:
+        file.truncate(size)
+
+
+def _open_at(path: str, offset: int) -> typing.BinaryIO:
+    file = open(path, "r+b")
+    file.seek(offset)
+    return file
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def download(session, url, path, resume=True, segments=1, **kwargs):
+    """
+    Download a URL to a file, returning the final response.
+
+    The body is written to `<path>.part`, which is renamed to `path` once it is
+    complete. If `resume` is set and an earlier download was interrupted, then
+    only the rest of the file is requested, using `Range` and `If-Range`.
+
+    With `segments` greater than one, and if a `HEAD` request shows that the
+    server supports ranges, the file is instead fetched as that many ranges at
+    once. The `HEAD` response is returned in that case.
+    """
+    path = os.fspath(path)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if segments > 1:
+        probe = await session.head(url, headers=headers, allow_redirects=True, **kwargs)
+        length = probe.headers.get("content-length", "")
+        if (
+            probe.status_code == 200
+            and probe.headers.get("accept-ranges", "").lower() == "bytes"
+            and "content-encoding" not in probe.headers
+            and length.isdigit()
+            and int(length) >= 2 * MIN_SEGMENT_SIZE
+        ):
+            try:
+                await download_segments(
+                    session,
+                    probe.url,
+                    path,
+                    int(length),
+                    segments,
+                    headers,
+                    _validator(probe.headers),
+                    **kwargs
+                )
+            except RangesNotSupported:
+                pass
+            else:
+                return probe
+    return await download_stream(session, url, path, resume, headers, **kwargs)
+
+
+async def download_stream(session, url, path, resume, headers, **kwargs):
+    loop = asyncio.get_event_loop()
+    part_path = path + ".part"
+    meta_path = path + ".part.json"
+
+    for ranged in (resume, False):
+        offset, validator = 0, None
+        if ranged:
+            offset, validator = await loop.run_in_executor(
+                None, _partial_state, part_path, meta_path, url
+            )
+        request_headers = dict(headers)
+        if offset:
+            request_headers["Range"] = "bytes=%d-" % offset
+            request_headers["If-Range"] = validator
+
+        response = await session.get(
+            url, headers=request_headers, stream=True, **kwargs
+        )
+        try:
+            if offset and response.status_code == 416:
+                # The partial file may have been complete already.
+                if _content_range(response.headers)[1] == offset:
+                    break
+                continue
+
+            response.raise_for_status()
+            append = bool(offset) and response.status_code == 206
+            if append and _content_range(response.headers)[0] != offset:
+                continue
+            if not append:
+                await loop.run_in_executor(
+                    None, _save_meta, meta_path, url, _validator(response.headers)
+                )
+            await response.save_to(part_path, append=append)
+            break
+        finally:
+            await response.close()
+
+    await loop.run_in_executor(None, _finish, part_path, meta_path, path)
+    return response
+
+
+async def download_segments(
+    session, url, path, length, segments, headers, validator, **kwargs
+):
+    """
+    Download a file as concurrent range requests, each writing directly to its
+    own offset in a preallocated `.part` file. Raises `RangesNotSupported` if
+    the server sends the whole file instead, or if the file changes part way.
+    """
+    loop = asyncio.get_event_loop()
+    part_path = path + ".part"
+    meta_path = path + ".part.json"
+    await loop.run_in_executor(None, _remove, meta_path)
+    await loop.run_in_executor(None, _preallocate, part_path, length)
+
+    segments = min(segments, length // MIN_SEGMENT_SIZE)
+    size = -(-length // segments)
+    tasks = [
+        asyncio.ensure_future(
+            download_segment(
+                session,
+                url,
+                part_path,
+                start,
+                min(start + size, length) - 1,
+                headers,
+                validator,
+                **kwargs
+            )
+        )
+        for start in range(0, length, size)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    await loop.run_in_executor(None, _finish, part_path, meta_path, path)
+
+
+async def download_segment(
+    session, url, part_path, start, end, headers, validator, **kwargs
+):
+    """
+    Download the bytes from `start` to `end` inclusive into the `.part` file,
+    retrying from where it left off if the connection fails.
+    """
+    loop = asyncio.get_event_loop()
+    position = start
+    for attempt in range(SEGMENT_RETRIES + 1):
+        request_headers = dict(headers)
+        request_headers["Range"] = "bytes=%d-%d" % (position, end)
+        if validator is not None:
+            request_headers["If-Range"] = validator
+
+        file = await loop.run_in_executor(None, _open_at, part_path, position)
+        try:
+            response = await session.get(
+                url, headers=request_headers, stream=True, **kwargs
+            )
+            try:
+                response.raise_for_status()
+                if (
+                    response.status_code != 206
+                    or _content_range(response.headers)[0] != position
+                ):
+                    raise RangesNotSupported()
+                await response.write_to(file)
+                return
+            finally:
+                await response.close()
+        except (ConnectionError, Timeout):
+            if attempt == SEGMENT_RETRIES:
+                raise
+        finally:
+            position = await loop.run_in_executor(None, file.tell)
+            await loop.run_in_executor(None, file.close)
@@ -3,6 +3,8 @@ from requests.exceptions import (
     ConnectTimeout,
     FileModeWarning,
     HTTPError,
+    InvalidProxyURL,
+    ProxyError,
     ReadTimeout,
     RequestException,
     Timeout,
@@ -11,5 +13,21 @@ from requests.exceptions import (
 )
 
 
+class ConnectError(ConnectionError):
+    """Failed to establish a connection, so the request was never sent."""
+
+
+class PoolTimeout(Timeout):
+    """Timed out waiting for a connection from the connection pool."""
+
+
 class ContentNotAvailable(Exception):
     pass
+
+
+class LineTooLong(RequestException):
+    """A line in the response body exceeded the permitted length."""
+
+
+class IncompleteRead(ConnectionError):
+    """The response body was shorter than its Content-Length."""
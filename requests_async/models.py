@@ -1,11 +1,20 @@
+import asyncio
 import codecs
+import mmap
 
+import h11
+import http3
 from requests.models import PreparedRequest, Request, Response as BaseResponse
 
-from .exceptions import ContentNotAvailable
+from .exceptions import ContentNotAvailable, IncompleteRead, LineTooLong, ReadTimeout
 
 ITER_CHUNK_SIZE = 512
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Response bodies are written to disk in batches of at least this many bytes.
+WRITE_CHUNK_SIZE = 1024 * 1024
+
 
 async def stream_decode_response_unicode(aiterator, encoding):
     decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
@@ -18,7 +27,233 @@ async def stream_decode_response_unicode(aiterator, encoding):
         yield rv
 
 
+def as_bytes(buffer):
+    """
+    Return the contents of a buffer as `bytes`, without copying if it is a
+    view over the whole of an existing bytes object.
+    """
+    if isinstance(buffer, bytes):
+        return buffer
+    if isinstance(buffer.obj, bytes) and buffer.nbytes == len(buffer.obj):
+        return buffer.obj
+    return buffer.tobytes()
+
+
+async def rechunk(aiterator, chunk_size=None, max_chunk=None):
+    """
+    Regroup an async iterator of buffers into `memoryview` chunks of exactly
+    `chunk_size` bytes, with only the final chunk allowed to be shorter.
+
+    If `chunk_size` is `None` the buffers are passed through as they were
+    received. In either case `max_chunk` bounds the size of each chunk.
+    """
+    if max_chunk is not None and (chunk_size is None or chunk_size > max_chunk):
+        limit = max_chunk
+    else:
+        limit = chunk_size
+
+    if chunk_size is None:
+        async for part in aiterator:
+            view = memoryview(part)
+            if limit is None or len(view) <= limit:
+                yield view
+            else:
+                for start in range(0, len(view), limit):
+                    yield view[start : start + limit]
+        return
+
+    buffered = []
+    buffered_size = 0
+    async for part in aiterator:
+        view = memoryview(part)
+        if buffered:
+            needed = limit - buffered_size
+            if len(view) < needed:
+                buffered.append(view)
+                buffered_size += len(view)
+                continue
+            buffered.append(view[:needed])
+            yield memoryview(b"".join(buffered))
+            view = view[needed:]
+            buffered = []
+            buffered_size = 0
+
+        end = len(view) - len(view) % limit
+        for start in range(0, end, limit):
+            yield view[start : start + limit]
+        if end < len(view):
+            buffered.append(view[end:])
+            buffered_size = len(view) - end
+
+    if buffered:
+        yield memoryview(b"".join(buffered))
+
+
+def _encode_chunk(chunk):
+    return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+async def stream_body(body, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Send a request body as an async iterator of chunks, without reading it all
+    into memory.
+
+    Buffers such as `memoryview`, `bytearray` or `mmap` are sliced without
+    copying, files are read `chunk_size` bytes at a time, with blocking reads
+    run in a thread, and iterators are passed through.
+    """
+    if isinstance(body, (bytearray, memoryview, mmap.mmap)):
+        view = memoryview(body).cast("B")
+        for start in range(0, len(view), chunk_size):
+            yield view[start : start + chunk_size]
+    elif hasattr(body, "__aiter__"):
+        async for chunk in body:
+            yield _encode_chunk(chunk)
+    elif hasattr(body, "read"):
+        read = body.read
+        if asyncio.iscoroutinefunction(read):
+            while True:
+                chunk = await read(chunk_size)
+                if not chunk:
+                    break
+                yield _encode_chunk(chunk)
+        else:
+            loop = asyncio.get_event_loop()
+            while True:
+                chunk = await loop.run_in_executor(None, read, chunk_size)
+                if not chunk:
+                    break
+                yield _encode_chunk(chunk)
+    else:
+        for chunk in body:
+            yield _encode_chunk(chunk)
+
+
+class LineSplitter:
+    """
+    Incrementally split a stream of bytes or text into lines. Each chunk is
+    only scanned once, however long the lines are.
+
+    With no `delimiter` lines are split as `splitlines()` would split them,
+    otherwise as `split(delimiter)` would. If `max_line_length` is set then
+    `LineTooLong` is raised rather than buffering a longer line.
+    """
+
+    def __init__(self, delimiter=None, max_line_length=None):
+        self.delimiter = delimiter
+        self.max_line_length = max_line_length
+        self.pending = []
+        self.pending_size = 0
+        self.pending_cr = False
+        self.empty = None
+
+    def split(self, chunk):
+        if not chunk:
+            return []
+        if self.empty is None:
+            self.empty = chunk[:0]
+        if self.delimiter is None:
+            return self._splitlines(chunk)
+        return self._split(chunk)
+
+    def flush(self):
+        if self.empty is None:
+            return []
+        if self.delimiter is not None or self.pending or self.pending_cr:
+            self.pending_cr = False
+            return [self._take(self.empty)]
+        return []
+
+    def _splitlines(self, chunk):
+        lines = []
+        if self.pending_cr:
+            # The previous chunk ended in a "\r", which may have been the first
+            # half of a "\r\n" line ending.
+            self.pending_cr = False
+            lines.append(self._take(self.empty))
+            if chunk[:1] == ("\n" if isinstance(chunk, str) else b"\n"):
+                chunk = chunk[1:]
+                if not chunk:
+                    return lines
+
+        crlf = "\r\n" if isinstance(chunk, str) else b"\r\n"
+        pieces = chunk.splitlines(keepends=True)
+        last = pieces.pop()
+        for piece in pieces:
+            lines.append(self._take(piece[:-2] if piece.endswith(crlf) else piece[:-1]))
+
+        stripped = last.splitlines()[0]
+        if len(stripped) == len(last):
+            self._append(last)
+        elif last.endswith(crlf[:1]):
+            self._append(stripped)
+            self.pending_cr = True
+        else:
+            lines.append(self._take(stripped))
+        return lines
+
+    def _split(self, chunk):
+        lines = []
+        delimiter = self.delimiter
+        start = 0
+
+        overlap = len(delimiter) - 1
+        if overlap and self.pending:
+            # Look for a delimiter that straddles the previous chunk and this one.
+            tail = self._tail(overlap)
+            index = (tail + chunk[:overlap]).find(delimiter)
+            if index != -1:
+                cut = len(tail) - index
+                lines.append(self._take(self.empty)[:-cut])
+                start = len(delimiter) - cut
+
+        while True:
+            index = chunk.find(delimiter, start)
+            if index == -1:
+                break
+            lines.append(self._take(chunk[start:index]))
+            start = index + len(delimiter)
+
+        if start < len(chunk):
+            self._append(chunk[start:])
+        return lines
+
+    def _tail(self, size):
+        tail = self.empty
+        for piece in reversed(self.pending):
+            tail = piece + tail
+            if len(tail) >= size:
+                break
+        return tail[-size:]
+
+    def _append(self, data):
+        self.pending.append(data)
+        self.pending_size += len(data)
+        self._check_length(self.pending_size)
+
+    def _take(self, data):
+        self._check_length(self.pending_size + len(data))
+        if self.pending:
+            self.pending.append(data)
+            data = self.empty.join(self.pending)
+            self.pending = []
+            self.pending_size = 0
+        return data
+
+    def _check_length(self, size):
+        if self.max_line_length is not None and size > self.max_line_length:
+            raise LineTooLong(
+                "Line exceeded the maximum length of %d." % self.max_line_length
+            )
+
+
 class Response(BaseResponse):
+    def __init__(self):
+        super(Response, self).__init__()
+        self._stream = None
+        self._pending = None
+        self._position = 0
+
     @property
     def content(self):
         if self._content is False:
@@ -27,66 +262,173 @@ class Response(BaseResponse):
 
     async def read(self):
         if self._content is False:
-            body = b""
-            async for chunk in self.iter_content(ITER_CHUNK_SIZE):
-                body += chunk
-            self._content = body
+            self._content = b"".join([chunk async for chunk in self._iter_chunks()])
+            self._content_consumed = True
         return self._content
 
-    async def iter_content(self, chunk_size=1, decode_unicode=False):
-        if self._content is False:
-            stream = self.raw.stream
-        else:
+    async def readinto(self, buffer):
+        """
+        Read body bytes directly into a caller-owned writable buffer, such as
+        a `bytearray` or `memoryview`. Returns the number of bytes written,
+        which is zero once the body has been exhausted.
+        """
+        view = memoryview(buffer).cast("B")
+        size = len(view)
+
+        if self._content is not False:
+            data = memoryview(self._content)[self._position : self._position + size]
+            view[: len(data)] = data
+            self._position += len(data)
+            return len(data)
+
+        filled = 0
+        while filled < size:
+            chunk = await self._next_chunk()
+            if chunk is None:
+                break
+            count = min(len(chunk), size - filled)
+            view[filled : filled + count] = chunk[:count]
+            if count < len(chunk):
+                self._pending = chunk[count:]
+            filled += count
+        return filled
 
-            async def stream():
+    async def _next_chunk(self):
+        """
+        Return the next network chunk as a memoryview, or `None` once the
+        stream is exhausted.
+        """
+        if self._pending is not None:
+            chunk, self._pending = self._pending, None
+            return chunk
+        if self._stream is None:
+            self._stream = self.raw.stream()
+        while True:
+            try:
+                chunk = await self._stream.__anext__()
+            except StopAsyncIteration:
+                return None
+            except h11.RemoteProtocolError as exc:
+                raise IncompleteRead(exc, response=self)
+            except http3.ReadTimeout as exc:
+                raise ReadTimeout(exc, response=self)
+            if chunk:
+                return memoryview(chunk)
+
+    async def _iter_chunks(self):
+        if self._content is not False:
+            if self._content:
                 yield self._content
+            return
+        while True:
+            chunk = await self._next_chunk()
+            if chunk is None:
+                break
+            yield chunk
+
+    async def iter_buffers(self, chunk_size=None, max_chunk=None):
+        """
+        Like `iter_content()`, but yields `memoryview` slices over the
+        received network buffers, so that no copies are made except where a
+        chunk straddles two network reads.
+        """
+        if chunk_size is not None and not isinstance(chunk_size, int):
+            raise TypeError(
+                "chunk_size must be an int, it is instead a %s." % type(chunk_size)
+            )
+        async for chunk in rechunk(self._iter_chunks(), chunk_size, max_chunk):
+            yield chunk
 
-        async def generate():
-            data = b""
-            async for part in stream():
-                data += part
-                while len(data) >= chunk_size:
-                    yield data[:chunk_size]
-                    data = data[chunk_size:]
-            if data:
-                yield data
+    async def iter_content(self, chunk_size=1, decode_unicode=False, max_chunk=None):
+        chunks = (
+            as_bytes(chunk) async for chunk in self.iter_buffers(chunk_size, max_chunk)
+        )
 
         if decode_unicode and self.encoding is not None:
-            async for chunk in stream_decode_response_unicode(
-                generate(), self.encoding
-            ):
+            async for chunk in stream_decode_response_unicode(chunks, self.encoding):
                 yield chunk
         else:
-            async for chunk in generate():
+            async for chunk in chunks:
                 yield chunk
 
     async def iter_lines(
-        self, chunk_size=ITER_CHUNK_SIZE, decode_unicode=False, delimiter=None
+        self,
+        chunk_size=ITER_CHUNK_SIZE,
+        decode_unicode=False,
+        delimiter=None,
+        max_line_length=None,
     ):
-        pending = None
+        splitter = LineSplitter(delimiter, max_line_length)
 
         async for chunk in self.iter_content(
             chunk_size=chunk_size, decode_unicode=decode_unicode
         ):
+            for line in splitter.split(chunk):
+                yield line
 
-            if pending is not None:
-                chunk = pending + chunk
+        for line in splitter.flush():
+            yield line
 
-            if delimiter:
-                lines = chunk.split(delimiter)
-            else:
-                lines = chunk.splitlines()
+    async def save_to(self, path, append=False):
+        """
+        Stream the body to a file, returning the number of bytes written.
 
-            if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
-                pending = lines.pop()
-            else:
-                pending = None
+        Writes are run in a thread, overlapped with reading from the network.
+        Raises `IncompleteRead` if less than `Content-Length` bytes arrive.
+        """
+        loop = asyncio.get_event_loop()
+        file = await loop.run_in_executor(None, open, path, "ab" if append else "wb")
+        try:
+            return await self.write_to(file)
+        finally:
+            await loop.run_in_executor(None, file.close)
 
-            for line in lines:
-                yield line
+    async def write_to(self, file):
+        """
+        Stream the body to an open binary file, from its current position.
+        """
+        loop = asyncio.get_event_loop()
+        writing = None
+        batch = []
+        batch_size = 0
+        total = 0
+        try:
+            async for chunk in self._iter_chunks():
+                batch.append(chunk)
+                batch_size += len(chunk)
+                if batch_size >= WRITE_CHUNK_SIZE:
+                    data = batch[0] if len(batch) == 1 else b"".join(batch)
+                    if writing is not None:
+                        await writing
+                    writing = loop.run_in_executor(None, file.write, data)
+                    total += batch_size
+                    batch = []
+                    batch_size = 0
+        finally:
+            # Flush whatever has been received, even on error, so that an
+            # interrupted download can be resumed from where it stopped.
+            if writing is not None:
+                await writing
+            if batch:
+                data = b"".join(batch)
+                await loop.run_in_executor(None, file.write, data)
+                total += batch_size
+        self._content_consumed = True
 
-        if pending is not None:
-            yield pending
+        expected = self.headers.get("Content-Length")
+        if (
+            expected is not None
+            and expected.isdigit()
+            and "Content-Encoding" not in self.headers
+            and self.request is not None
+            and self.request.method != "HEAD"
+            and total != int(expected)
+        ):
+            raise IncompleteRead(
+                "Received %d bytes, but Content-Length was %s." % (total, expected),
+                response=self,
+            )
+        return total
 
     async def __aiter__(self):
         """Allows you to use a response as an iterator."""
@@ -0,0 +1,224 @@
+import asyncio
+import random
+import time
+
+import http3
+from http3.dispatch.connection import HTTPConnection
+from http3.exceptions import NotConnected
+
+# Connection lifetimes are shortened by up to this fraction at random, so that
+# connections opened together don't all expire together.
+CONNECTION_AGE_JITTER = 0.1
+
+
+class ConnectionPool(http3.ConnectionPool):
+    """
+    An `http3.ConnectionPool` that additionally enforces per-host limits.
+
+    * `max_connections_per_host` - The maximum number of connections that may
+      be open to any single origin. Requests beyond this wait for a connection
+      to be released, for at most `pool_limits.pool_timeout` seconds.
+    * `max_keepalive_per_host` - The maximum number of idle connections that
+      are kept alive for any single origin.
+    * `keepalive_expiry` - Close connections that have been idle for longer
+      than this many seconds.
+    * `max_connection_age` - Close connections once they have been open for
+      this many seconds, less some random jitter.
+
+    Expired connections are closed when they are released, or when they are
+    found idle in the pool while acquiring a connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections_per_host=None,
+        max_keepalive_per_host=None,
+        keepalive_expiry=None,
+        max_connection_age=None,
+        **kwargs
+    ):
+        super(ConnectionPool, self).__init__(**kwargs)
+        self.max_connections_per_host = max_connections_per_host
+        self.max_keepalive_per_host = max_keepalive_per_host
+        self.keepalive_expiry = keepalive_expiry
+        self.max_connection_age = max_connection_age
+        self.reserved = {}
+        self.num_recycled = 0
+        self._released = None
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.num_connections,
+            "active": len(self.active_connections),
+            "idle": len(self.keepalive_connections),
+            "recycled": self.num_recycled,
+        }
+
+    def num_host_connections(self, origin) -> int:
+        return (
+            len(self.active_connections.by_origin.get(origin, ()))
+            + len(self.keepalive_connections.by_origin.get(origin, ()))
+            + self.reserved.get(origin, 0)
+        )
+
+    async def send(self, request, verify=None, cert=None, timeout=None):
+        allow_connection_reuse = True
+        connection = None
+        while connection is None:
+            connection = await self.acquire_connection(
+                origin=request.url.origin, allow_connection_reuse=allow_connection_reuse
+            )
+            try:
+                response = await connection.send(
+                    request, verify=verify, cert=cert, timeout=timeout
+                )
+            except BaseException as exc:
+                self.active_connections.remove(connection)
+                self.max_connections.release()
+                self.notify_released()
+                # Close the socket, so that a failed or cancelled request
+                # can't leave it open with a half-sent request on it.
+                try:
+                    await connection.close()
+                except Exception:
+                    pass
+                if isinstance(exc, NotConnected) and allow_connection_reuse:
+                    connection = None
+                    allow_connection_reuse = False
+                else:
+                    raise exc
+
+        return response
+
+    async def acquire_connection(self, origin, allow_connection_reuse=True):
+        pool_timeout = self.pool_limits.pool_timeout
+        started = time.monotonic()
+
+        while True:
+            connection = None
+            if allow_connection_reuse:
+                await self.close_expired_connections()
+                connection = self.active_connections.pop_by_origin(
+                    origin, http2_only=True
+                )
+                if connection is not None and self.is_expired(connection):
+                    # Leave the HTTP/2 connection to finish its current streams.
+                    self.active_connections.add(connection)
+                    connection = None
+                if connection is None:
+                    connection = self.keepalive_connections.pop_by_origin(origin)
+            if connection is not None:
+                break
+
+            if (
+                self.max_connections_per_host is None
+                or self.num_host_connections(origin) < self.max_connections_per_host
+            ):
+                connection = await self.new_connection(origin)
+                break
+
+            # Wait for a connection to this origin to be released.
+            if pool_timeout is None:
+                remaining = None
+            else:
+                remaining = pool_timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise http3.PoolTimeout()
+            if self._released is None:
+                self._released = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._released.wait(), remaining)
+            except asyncio.TimeoutError:
+                raise http3.PoolTimeout() from None
+
+        connection.idle_since = None
+        self.active_connections.add(connection)
+        return connection
+
+    async def new_connection(self, origin):
+        # Reserve a slot against the per-host limit while we wait on the
+        # global limit, so that concurrent callers can't overshoot it.
+        self.reserved[origin] = self.reserved.get(origin, 0) + 1
+        try:
+            await self.max_connections.acquire()
+        finally:
+            self.reserved[origin] -= 1
+            if not self.reserved[origin]:
+                del self.reserved[origin]
+
+        connection = self.create_connection(origin)
+        if self.max_connection_age is None:
+            connection.expires_at = None
+        else:
+            jitter = self.max_connection_age * CONNECTION_AGE_JITTER * random.random()
+            connection.expires_at = time.monotonic() + self.max_connection_age - jitter
+        return connection
+
+    def create_connection(self, origin):
+        return HTTPConnection(
+            origin,
+            verify=self.verify,
+            cert=self.cert,
+            timeout=self.timeout,
+            backend=self.backend,
+            release_func=self.release_connection,
+        )
+
+    def is_expired(self, connection, now=None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        if connection.expires_at is not None and now >= connection.expires_at:
+            return True
+        return (
+            self.keepalive_expiry is not None
+            and connection.idle_since is not None
+            and now - connection.idle_since >= self.keepalive_expiry
+        )
+
+    async def close_expired_connections(self):
+        if self.keepalive_expiry is None and self.max_connection_age is None:
+            return
+
+        now = time.monotonic()
+        expired = [
+            connection
+            for connection in self.keepalive_connections
+            if self.is_expired(connection, now)
+        ]
+        for connection in expired:
+            self.keepalive_connections.remove(connection)
+            self.max_connections.release()
+            self.num_recycled += 1
+            await connection.close()
+        if expired:
+            self.notify_released()
+
+    async def release_connection(self, connection):
+        if connection.is_closed:
+            await super(ConnectionPool, self).release_connection(connection)
+        elif self.is_expired(connection):
+            self.active_connections.remove(connection)
+            self.max_connections.release()
+            self.num_recycled += 1
+            await connection.close()
+        elif (
+            self.max_keepalive_per_host is not None
+            and len(self.keepalive_connections.by_origin.get(connection.origin, ()))
+            >= self.max_keepalive_per_host
+        ):
+            self.active_connections.remove(connection)
+            self.max_connections.release()
+            await connection.close()
+        else:
+            connection.idle_since = time.monotonic()
+            await super(ConnectionPool, self).release_connection(connection)
+        self.notify_released()
+
+    def notify_released(self):
+        """
+        Wake up any requests that are waiting on a per-host limit.
+        """
+        if self._released is not None:
+            self._released.set()
+            self._released = None
@@ -0,0 +1,113 @@
+import functools
+import typing
+
+import h11
+import http3
+from http3.config import TimeoutConfig
+from http3.dispatch.connection import HTTPConnection
+from http3.dispatch.http2 import HTTP2Connection
+from http3.dispatch.http11 import HTTP11Connection
+from http3.interfaces import Protocol
+
+from .pool import ConnectionPool
+
+
+class ForwardingHTTP11Connection(HTTP11Connection):
+    """
+    An HTTP/1.1 connection to a proxy, which sends each request with its
+    absolute URL so that the proxy can forward it.
+    """
+
+    def __init__(self, *args, proxy_headers=None, **kwargs):
+        super(ForwardingHTTP11Connection, self).__init__(*args, **kwargs)
+        self.proxy_headers = [
+            (key.lower().encode("latin1"), value.encode("latin1"))
+            for key, value in (proxy_headers or {}).items()
+        ]
+
+    async def _send_request(self, request, timeout=None):
+        method = request.method.encode("ascii")
+        url = request.url.copy_with(fragment=None)
+        target = str(url).encode("ascii")
+        headers = list(request.headers.raw)
+        names = {key.lower() for key, _ in headers}
+        headers.extend(item for item in self.proxy_headers if item[0] not in names)
+        event = h11.Request(method=method, target=target, headers=headers)
+        await self._send_event(event, timeout)
+
+
+class ProxyConnection(HTTPConnection):
+    """
+    A connection to an origin by way of an HTTP proxy. Requests to `https`
+    origins are sent through a `CONNECT` tunnel, and others are forwarded.
+    """
+
+    def __init__(self, origin, proxy_origin, proxy_headers=None, **kwargs):
+        super(ProxyConnection, self).__init__(origin, **kwargs)
+        self.proxy_origin = proxy_origin
+        self.proxy_headers = proxy_headers or {}
+
+    async def connect(self, verify=None, cert=None, timeout=None):
+        timeout = self.timeout if timeout is None else TimeoutConfig(timeout)
+        if self.release_func is None:
+            on_release = None
+        else:
+            on_release = functools.partial(self.release_func, self)
+
+        if not self.origin.is_ssl:
+            reader, writer, _ = await self.backend.connect(
+                self.proxy_origin.host, self.proxy_origin.port, None, timeout
+            )
+            self.h11_connection = ForwardingHTTP11Connection(
+                reader,
+                writer,
+                self.backend,
+                on_release=on_release,
+                proxy_headers=self.proxy_headers,
+            )
+            return
+
+        ssl = self.ssl.with_overrides(verify=verify, cert=cert)
+        ssl_context = await ssl.load_ssl_context()
+        reader, writer, protocol = await self.backend.connect_tunnel(
+            self.proxy_origin.host,
+            self.proxy_origin.port,
+            self.origin.host,
+            self.origin.port,
+            ssl_context,
+            timeout,
+            proxy_headers=self.proxy_headers,
+        )
+        if protocol == Protocol.HTTP_2:
+            self.h2_connection = HTTP2Connection(
+                reader, writer, self.backend, on_release=on_release
+            )
+        else:
+            self.h11_connection = HTTP11Connection(
+                reader, writer, self.backend, on_release=on_release
+            )
+
+
+class ProxyConnectionPool(ConnectionPool):
+    """
+    A `ConnectionPool` whose connections all go through the given proxy.
+    Connections are pooled by target origin, so each `CONNECT` tunnel is
+    reused for later requests to the same host.
+    """
+
+    def __init__(self, proxy_url: str, proxy_headers=None, **kwargs: typing.Any):
+        super(ProxyConnectionPool, self).__init__(**kwargs)
+        self.proxy_origin = http3.Origin(proxy_url)
+        self.proxy_headers = proxy_headers or {}
+
+    def create_connection(self, origin):
+        return ProxyConnection(
+            origin,
+            proxy_origin=self.proxy_origin,
+            proxy_headers=self.proxy_headers,
+            verify=self.verify,
+            cert=self.cert,
+            timeout=self.timeout,
+            backend=self.backend,
+            release_func=self.release_connection,
+        )
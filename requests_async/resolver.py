@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import concurrent.futures
+import ipaddress
+import socket
+import time
+import typing
+
+Addresses = typing.List[typing.Tuple[int, str]]
+
+
+class Resolver:
+    """
+    Resolves hostnames using `getaddrinfo` in a bounded thread pool, and caches
+    the results in-process.
+
+    * `hosts` - A static mapping of hostnames to an address, or a list of
+      addresses, which are returned without any lookup.
+    * `ttl` - How many seconds a successful lookup is cached for.
+    * `negative_ttl` - How many seconds a failed lookup is cached for.
+    * `stale_ttl` - For how many seconds after expiry a cached address may
+      still be returned, while it is refreshed in the background.
+    * `max_workers` - The number of threads used for lookups.
+    * `max_size` - The maximum number of hostnames cached.
+
+    Concurrent lookups for the same hostname share a single `getaddrinfo` call.
+    """
+
+    def __init__(
+        self,
+        hosts: typing.Dict[str, typing.Union[str, typing.List[str]]] = None,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        stale_ttl: float = 30.0,
+        max_workers: int = 4,
+        max_size: int = 1024,
+    ) -> None:
+        self.hosts = {}  # type: typing.Dict[str, Addresses]
+        for host, addresses in (hosts or {}).items():
+            if isinstance(addresses, str):
+                addresses = [addresses]
+            self.hosts[host.lower()] = [
+                (_address_family(address), address) for address in addresses
+            ]
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.max_workers = max_workers
+        self.max_size = max_size
+        self.cache = (
+            collections.OrderedDict()
+        )  # type: typing.Dict[str, typing.Tuple[float, typing.Any]]
+        self.inflight = {}  # type: typing.Dict[str, asyncio.Future]
+        self._executor = None
+
+    async def resolve(self, host: str) -> Addresses:
+        """
+        Return a list of `(family, address)` pairs for the given hostname.
+        Raises `socket.gaierror` if the hostname cannot be resolved.
+        """
+        host = host.lower()
+        if host in self.hosts:
+            return self.hosts[host]
+
+        family = _address_family(host, default=None)
+        if family is not None:
+            return [(family, host.strip("[]"))]
+
+        now = time.monotonic()
+        try:
+            expires_at, result = self.cache[host]
+        except KeyError:
+            pass
+        else:
+            self.cache.move_to_end(host)
+            if now < expires_at:
+                return _result(result)
+            if not isinstance(result, Exception) and now < expires_at + self.stale_ttl:
+                self.refresh(host)
+                return result
+
+        return _result(await asyncio.shield(self.refresh(host)))
+
+    def refresh(self, host: str) -> asyncio.Future:
+        """
+        Start a lookup for the given hostname, unless one is already running.
+        """
+        if host not in self.inflight:
+            self.inflight[host] = asyncio.ensure_future(self._refresh(host))
+        return self.inflight[host]
+
+    async def _refresh(self, host: str) -> typing.Any:
+        try:
+            try:
+                result = await self.lookup(host)
+                ttl = self.ttl
+            except socket.gaierror as exc:
+                result = exc
+                ttl = self.negative_ttl
+            self.cache[host] = (time.monotonic() + ttl, result)
+            self.cache.move_to_end(host)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+            return result
+        finally:
+            del self.inflight[host]
+
+    async def lookup(self, host: str) -> Addresses:
+        """
+        Resolve a hostname, without caching.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers
+            )
+        loop = asyncio.get_event_loop()
+        infos = await loop.run_in_executor(
+            self._executor, socket.getaddrinfo, host, None, 0, socket.SOCK_STREAM
+        )
+        addresses = []  # type: Addresses
+        for family, _, _, _, sockaddr in infos:
+            if (family, sockaddr[0]) not in addresses:
+                addresses.append((family, sockaddr[0]))
+        return addresses
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _address_family(address: str, default: typing.Any = socket.AF_INET) -> typing.Any:
+    try:
+        ip_address = ipaddress.ip_address(address.strip("[]"))
+    except ValueError:
+        return default
+    return socket.AF_INET6 if ip_address.version == 6 else socket.AF_INET
+
+
+def _result(result: typing.Any) -> Addresses:
+    if isinstance(result, Exception):
+        raise socket.gaierror(*result.args)
+    return result
@@ -0,0 +1,118 @@
+import calendar
+import email.utils
+import random
+import time
+import typing
+
+IDEMPOTENT_METHODS = frozenset(["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"])
+
+# Status codes for which a `Retry-After` header is honored, even if they are
+# not in `status_forcelist`.
+RETRY_AFTER_STATUS_CODES = frozenset([413, 429, 503])
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of the requests being made, so that retries
+    can't amplify an outage into a retry storm.
+
+    Each request deposits `ratio` tokens, and each retry withdraws one. The
+    balance starts at, and is capped at, `max_tokens`, so that a few retries
+    are possible before much traffic has been seen.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.retries = 0
+        self.rejected = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            self.rejected += 1
+            return False
+        self.tokens -= 1.0
+        self.retries += 1
+        return True
+
+
+class Retry:
+    """
+    A policy for retrying failed requests.
+
+    * `total` - The maximum number of retries for any one request.
+    * `backoff_factor` - Retry `n` waits for a random time between zero and
+      `backoff_factor * 2 ** n` seconds ("full jitter").
+    * `backoff_max` - The upper bound on the backoff between retries.
+    * `status_forcelist` - Response status codes that should be retried.
+    * `allowed_methods` - Methods that may be retried after the request may
+      have reached the server. Requests that failed to connect are always
+      retried.
+    * `respect_retry_after_header` - Wait for as long as the server asks in a
+      `Retry-After` header, instead of the computed backoff, up to at most
+      `backoff_max` seconds.
+    """
+
+    def __init__(
+        self,
+        total: int = 3,
+        backoff_factor: float = 0.1,
+        backoff_max: float = 10.0,
+        status_forcelist: typing.Iterable[int] = (),
+        allowed_methods: typing.Iterable[str] = IDEMPOTENT_METHODS,
+        respect_retry_after_header: bool = True,
+    ) -> None:
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.status_forcelist = frozenset(status_forcelist)
+        self.allowed_methods = frozenset(method.upper() for method in allowed_methods)
+        self.respect_retry_after_header = respect_retry_after_header
+
+    @classmethod
+    def from_int(cls, retries: typing.Union[int, "Retry", None]) -> "Retry":
+        if isinstance(retries, Retry):
+            return retries
+        return cls(total=retries or 0, backoff_factor=0)
+
+    def is_method_retryable(self, method: str) -> bool:
+        return method.upper() in self.allowed_methods
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool) -> bool:
+        if not self.is_method_retryable(method):
+            return False
+        if status_code in self.status_forcelist:
+            return True
+        return (
+            self.respect_retry_after_header
+            and has_retry_after
+            and status_code in RETRY_AFTER_STATUS_CODES
+        )
+
+    def get_backoff_time(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max, self.backoff_factor * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def get_retry_after(
+        self, headers: typing.Mapping[str, str]
+    ) -> typing.Optional[float]:
+        """
+        Parse a `Retry-After` header, as either seconds or an HTTP date, and
+        return the delay in seconds, capped at `backoff_max`.
+        """
+        value = headers.get("retry-after")
+        if value is None or not self.respect_retry_after_header:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            delay = float(value)
+        else:
+            parsed = email.utils.parsedate(value)
+            if parsed is None:
+                return None
+            delay = max(0.0, calendar.timegm(parsed) - time.time())
+        return min(delay, self.backoff_max)
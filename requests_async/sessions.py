@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 from urllib.parse import urljoin, urlparse
 
@@ -10,9 +11,10 @@ from requests.exceptions import (
     TooManyRedirects,
 )
 from requests.status_codes import codes
+from requests.structures import CaseInsensitiveDict
 from requests.utils import requote_uri, rewind_body
 
-from . import adapters
+from . import adapters, caching, downloads
 from .cookies import extract_cookies_to_jar
 
 
@@ -27,12 +29,52 @@ def to_native_string(string, encoding="ascii"):
 
 
 class Session(requests.Session):
-    def __init__(self, *args, **kwargs) -> None:
-        super(Session, self).__init__(*args, **kwargs)
-        adapter = adapters.HTTPAdapter()
+    def __init__(
+        self,
+        pool_connections=adapters.DEFAULT_POOLSIZE,
+        pool_maxsize=adapters.DEFAULT_POOLSIZE,
+        max_connections=adapters.DEFAULT_MAX_CONNECTIONS,
+        max_connections_per_host=None,
+        pool_timeout=adapters.DEFAULT_POOL_TIMEOUT,
+        keepalive_expiry=None,
+        max_connection_age=None,
+        resolver=None,
+        cache=None,
+        max_retries=0,
+        retry_budget=None,
+    ) -> None:
+        super(Session, self).__init__()
+        adapter_kwargs = dict(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_connections=max_connections,
+            max_connections_per_host=max_connections_per_host,
+            pool_timeout=pool_timeout,
+            keepalive_expiry=keepalive_expiry,
+            max_connection_age=max_connection_age,
+            resolver=resolver,
+            max_retries=max_retries,
+            retry_budget=retry_budget,
+        )
+        if cache:
+            if cache is True:
+                cache = caching.ResponseCache()
+            adapter = caching.CachingAdapter(cache=cache, **adapter_kwargs)
+        else:
+            adapter = adapters.HTTPAdapter(**adapter_kwargs)
         self.mount("http://", adapter)
         self.mount("https://", adapter)
 
+    def prepare_request(self, request):
+        prep = super(Session, self).prepare_request(request)
+        # `requests` doesn't recognise async iterators as streams, and labels
+        # them as form data. Drop that unless it was set explicitly.
+        if hasattr(prep.body, "__aiter__"):
+            headers = CaseInsensitiveDict(request.headers or {})
+            if "Content-Type" not in headers and "Content-Type" not in self.headers:
+                prep.headers.pop("Content-Type", None)
+        return prep
+
     async def request(
         self,
         method,
@@ -80,6 +122,108 @@ class Session(requests.Session):
 
         return resp
 
+    async def map(self, requests, concurrency=10, **kwargs):
+        """
+        Send many requests, with at most `concurrency` in flight at once, and
+        return a list of results in the same order as the input.
+
+        Each result is either a `Response`, or the exception that was raised
+        while sending that request. See `as_completed()` for the accepted input.
+        """
+        results = []
+        async for index, result in self.as_completed(requests, concurrency, **kwargs):
+            if index >= len(results):
+                results.extend([None] * (index + 1 - len(results)))
+            results[index] = result
+        return results
+
+    async def as_completed(self, requests, concurrency=10, **kwargs):
+        """
+        Send many requests, with at most `concurrency` in flight at once, and
+        yield `(index, result)` pairs as each one finishes.
+
+        `requests` may be an iterator or an async iterator. Each item may be a
+        `Request`, a `PreparedRequest`, or a dict of arguments to `request()`.
+        Items are only taken from the input when there is capacity to send
+        them, and any keyword arguments are used as defaults for every request.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        if hasattr(requests, "__aiter__"):
+            iterator = requests.__aiter__()
+            is_async = True
+        else:
+            iterator = iter(requests)
+            is_async = False
+
+        pending = set()
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        if is_async:
+                            item = await iterator.__anext__()
+                        else:
+                            item = next(iterator)
+                    except (StopIteration, StopAsyncIteration):
+                        exhausted = True
+                        break
+                    task = asyncio.ensure_future(self._send_item(index, item, kwargs))
+                    pending.add(task)
+                    index += 1
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send_item(self, index, item, kwargs):
+        try:
+            if isinstance(item, requests.models.Request):
+                item = self.prepare_request(item)
+
+            if isinstance(item, requests.models.PreparedRequest):
+                settings = self.merge_environment_settings(
+                    item.url,
+                    kwargs.get("proxies") or {},
+                    kwargs.get("stream"),
+                    kwargs.get("verify"),
+                    kwargs.get("cert"),
+                )
+                send_kwargs = {
+                    "timeout": kwargs.get("timeout"),
+                    "allow_redirects": kwargs.get("allow_redirects", True),
+                }
+                send_kwargs.update(settings)
+                result = await self.send(item, **send_kwargs)
+            else:
+                result = await self.request(**dict(kwargs, **item))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            result = exc
+        return (index, result)
+
+    async def download(self, url, path, resume=True, segments=1, **kwargs):
+        """
+        Download a URL to a file, resuming an interrupted download of the
+        same URL if possible, or fetching `segments` ranges of it at once.
+        See `downloads.download()`.
+        """
+        return await downloads.download(
+            self, url, path, resume=resume, segments=segments, **kwargs
+        )
+
     async def get(self, url, **kwargs):
         kwargs.setdefault("allow_redirects", True)
         return await self.request("GET", url, **kwargs)
@@ -1,8 +1,18 @@
 import asyncio
+import itertools
+import shutil
+import subprocess
+from urllib.parse import urlsplit
 
 import pytest
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse, PlainTextResponse, RedirectResponse
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from starlette.routing import Route
 from uvicorn.config import Config
 from uvicorn.main import Server
@@ -47,6 +57,90 @@ async def hello_world(request):
     return PlainTextResponse("Hello, world!")
 
 
+response_counter = itertools.count()
+
+
+async def cached_response(request):
+    """
+    Respond with a counter, so that tests can tell when a response came from
+    a cache, and with any headers that are given in the query string. The
+    status code may be given as `status`.
+    """
+    headers = dict(request.query_params)
+    status_code = int(headers.pop("status", "200"))
+    etag = headers.get("ETag")
+    if etag is not None and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return PlainTextResponse(
+        str(next(response_counter)), status_code=status_code, headers=headers
+    )
+
+
+failure_counts = {}  # type: dict
+
+
+async def flaky_response(request):
+    """
+    Fail with the given `status` the first `fail` times that a `key` is
+    requested, then succeed.
+    """
+    key = request.query_params["key"]
+    failures = failure_counts.get(key, 0)
+    if failures < int(request.query_params.get("fail", "1")):
+        failure_counts[key] = failures + 1
+        headers = {}
+        if "retry_after" in request.query_params:
+            headers["Retry-After"] = request.query_params["retry_after"]
+        status_code = int(request.query_params.get("status", "503"))
+        return PlainTextResponse("Failed", status_code=status_code, headers=headers)
+    body = await request.body()
+    return PlainTextResponse("Attempts: %d %s" % (failures + 1, body.decode()))
+
+
+DOWNLOAD_CONTENT = bytes(range(256)) * 4096 * 4
+
+
+async def download_response(request):
+    """
+    Serve `DOWNLOAD_CONTENT`, with support for `Range` requests unless
+    `ranges=ignore` is given. The first response for each `key` is cut short
+    after `truncate` bytes.
+    """
+    content = DOWNLOAD_CONTENT
+    headers = {"ETag": '"download"', "Accept-Ranges": "bytes"}
+    status_code = 200
+    start = 0
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if request.query_params.get("ranges") == "ignore":
+        range_header = None
+    if range_header and (if_range is None or if_range == headers["ETag"]):
+        start = int(range_header[len("bytes=") :].split("-")[0])
+        if start >= len(content):
+            headers["Content-Range"] = "bytes */%d" % len(content)
+            return Response(status_code=416, headers=headers)
+        end = range_header.split("-")[1]
+        end = len(content) - 1 if not end else int(end)
+        headers["Content-Range"] = "bytes %d-%d/%d" % (start, end, len(content))
+        content = content[start : end + 1]
+        status_code = 206
+
+    headers["Content-Length"] = str(len(content))
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers)
+    key = request.query_params.get("key")
+    truncate = request.query_params.get("truncate")
+    if truncate is not None and key not in failure_counts:
+        failure_counts[key] = 1
+        content = content[: int(truncate)]
+
+    async def body():
+        yield content
+
+    return StreamingResponse(body(), status_code=status_code, headers=headers)
+
+
 async def redirect1(request):
     url = request.url_for("redirect2")
     return RedirectResponse(url)
@@ -67,8 +161,11 @@ routes = [
     ),
     Route("/echo_form_data", echo_form_data, methods=["POST", "PUT", "PATCH"]),
     Route("/echo_json", echo_json, methods=["POST", "PUT", "PATCH"]),
-    Route("/echo_headers", echo_headers),
+    Route("/echo_headers", echo_headers, methods=["GET", "POST"]),
     Route("/hello_world", hello_world),
+    Route("/cached", cached_response, methods=["GET", "POST"]),
+    Route("/flaky", flaky_response, methods=["GET", "POST", "PUT"]),
+    Route("/download", download_response, methods=["GET", "HEAD"]),
     Route("/redirect1", redirect1, name="redirect1"),
     Route("/redirect2", redirect2, name="redirect2"),
     Route("/redirect3", redirect3, name="redirect3"),
@@ -89,3 +186,120 @@ async def server():
     finally:
         server.should_exit = True
         await task
+
+
+@pytest.fixture(scope="session")
+def cert_files(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is required to create a test certificate")
+    directory = tmp_path_factory.mktemp("certs")
+    keyfile, certfile = str(directory / "key.pem"), str(directory / "cert.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=127.0.0.1", "-keyout", keyfile, "-out", certfile],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return keyfile, certfile
+
+
+@pytest.fixture
+async def https_server(cert_files):
+    keyfile, certfile = cert_files
+    config = Config(
+        app=app, lifespan="off", port=8443, ssl_keyfile=keyfile, ssl_certfile=certfile
+    )
+    server = Server(config=config)
+    task = asyncio.ensure_future(server.serve())
+    try:
+        while not server.started:
+            await asyncio.sleep(0.0001)
+        yield server
+    finally:
+        server.should_exit = True
+        await task
+
+
+class Proxy:
+    """
+    A minimal forward proxy, which records the `(method, target, credentials)`
+    of each request that it receives.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.required_auth = None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                lines = head.decode("latin1").split("\r\n")
+                method, target, _ = lines[0].split(" ")
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        key, value = line.split(":", 1)
+                        headers[key.lower()] = value.strip()
+                auth = headers.pop("proxy-authorization", None)
+                self.requests.append((method, target, auth))
+
+                if self.required_auth is not None and auth != self.required_auth:
+                    writer.write(b"HTTP/1.1 407 Proxy Authentication Required\r\n\r\n")
+                    await writer.drain()
+                    return
+
+                if method == "CONNECT":
+                    host, port = target.rsplit(":", 1)
+                    upstream = await asyncio.open_connection(host, int(port))
+                    writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+                    await asyncio.gather(
+                        self.pipe(reader, upstream[1]), self.pipe(upstream[0], writer)
+                    )
+                    return
+
+                url = urlsplit(target)
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = url.path + ("?" + url.query if url.query else "")
+                headers["connection"] = "close"
+                request = ["%s %s HTTP/1.1" % (method, path)]
+                request += ["%s: %s" % item for item in headers.items()]
+                upstream_reader, upstream_writer = await asyncio.open_connection(
+                    url.hostname, url.port
+                )
+                upstream_writer.write(
+                    ("\r\n".join(request) + "\r\n\r\n").encode("latin1") + body
+                )
+                writer.write(await upstream_reader.read())
+                upstream_writer.close()
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def pipe(self, reader, writer):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+async def proxy():
+    proxy = Proxy()
+    server = await asyncio.start_server(proxy.handle, "127.0.0.1", 8080)
+    try:
+        yield proxy
+    finally:
+        server.close()
+        await server.wait_closed()
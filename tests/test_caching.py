@@ -0,0 +1,124 @@
+import pytest
+
+import requests_async
+
+URL = "http://127.0.0.1:8000/cached"
+
+
+@pytest.mark.asyncio
+async def test_fresh_response_is_cached(server):
+    async with requests_async.Session(cache=True) as session:
+        first = await session.get(URL, params={"Cache-Control": "max-age=60"})
+        second = await session.get(URL, params={"Cache-Control": "max-age=60"})
+        assert first.text == second.text
+        assert second.headers["age"] == "0"
+        assert session.get_adapter(URL).cache.stats() == {
+            "entries": 1,
+            "size": session.get_adapter(URL).cache.size,
+            "hits": 1,
+            "misses": 1,
+            "revalidations": 0,
+        }
+
+
+@pytest.mark.asyncio
+async def test_no_store_is_not_cached(server):
+    params = {"Cache-Control": "no-store"}
+    async with requests_async.Session(cache=True) as session:
+        first = await session.get(URL, params=params)
+        second = await session.get(URL, params=params)
+        assert first.text != second.text
+
+
+@pytest.mark.asyncio
+async def test_request_no_cache_bypasses_cache(server):
+    params = {"Cache-Control": "max-age=60"}
+    async with requests_async.Session(cache=True) as session:
+        first = await session.get(URL, params=params)
+        second = await session.get(
+            URL, params=params, headers={"Cache-Control": "no-cache"}
+        )
+        assert first.text != second.text
+
+
+@pytest.mark.asyncio
+async def test_stale_response_is_revalidated(server):
+    params = {"Cache-Control": "max-age=0", "ETag": '"v1"'}
+    cache = requests_async.ResponseCache()
+    async with requests_async.Session(cache=cache) as session:
+        first = await session.get(URL, params=params)
+        second = await session.get(URL, params=params)
+        assert second.status_code == 200
+        assert first.text == second.text
+        assert cache.revalidations == 1
+        assert cache.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_is_not_cached(server):
+    params = {"Cache-Control": "max-age=60", "ETag": '"v1"'}
+    cache = requests_async.ResponseCache()
+    async with requests_async.Session(cache=cache) as session:
+        response = await session.get(
+            URL, params=params, headers={"If-None-Match": '"v1"'}
+        )
+        assert response.status_code == 304
+        assert cache.stats()["entries"] == 0
+
+        response = await session.get(URL, params=params)
+        assert response.status_code == 200
+        assert response.text
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_status_is_not_cached(server):
+    params = {"ETag": '"v1"', "status": "503"}
+    cache = requests_async.ResponseCache()
+    async with requests_async.Session(cache=cache) as session:
+        first = await session.get(URL, params=params)
+        second = await session.get(URL, params=params)
+        assert second.status_code == 503
+        assert first.text != second.text
+        assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_vary(server):
+    params = {"Cache-Control": "max-age=60", "Vary": "Accept-Language"}
+    async with requests_async.Session(cache=True) as session:
+        english = await session.get(
+            URL, params=params, headers={"Accept-Language": "en"}
+        )
+        french = await session.get(
+            URL, params=params, headers={"Accept-Language": "fr"}
+        )
+        again = await session.get(URL, params=params, headers={"Accept-Language": "fr"})
+        assert english.text != french.text
+        assert french.text == again.text
+
+
+@pytest.mark.asyncio
+async def test_unsafe_method_invalidates(server):
+    params = {"Cache-Control": "max-age=60"}
+    async with requests_async.Session(cache=True) as session:
+        first = await session.get(URL, params=params)
+        assert (await session.get(URL, params=params)).text == first.text
+        await session.post(URL, params=params)
+        second = await session.get(URL, params=params)
+        assert first.text != second.text
+
+
+def test_lru_eviction():
+    cache = requests_async.ResponseCache(max_size=250)
+    for index in range(3):
+        request = requests_async.Request("GET", "http://example.org/%d" % index)
+        response = requests_async.Response()
+        response.status_code = 200
+        response._content = b"x" * 100
+        response.url = request.url
+        cache.set(request.prepare(), requests_async.caching.CacheEntry(response))
+    assert cache.size <= 250
+    assert [key[1] for key in cache.entries] == [
+        "http://example.org/1",
+        "http://example.org/2",
+    ]
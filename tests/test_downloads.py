@@ -0,0 +1,106 @@
+import os
+import uuid
+
+import pytest
+
+import requests_async
+from requests_async import downloads
+from tests.conftest import DOWNLOAD_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_save_to(server, tmp_path):
+    path = str(tmp_path / "download")
+    response = await requests_async.get("http://127.0.0.1:8000/download", stream=True)
+    assert await response.save_to(path) == len(DOWNLOAD_CONTENT)
+    with open(path, "rb") as file:
+        assert file.read() == DOWNLOAD_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_save_to_incomplete(server, tmp_path):
+    url = "http://127.0.0.1:8000/download?truncate=1000&key=" + uuid.uuid4().hex
+    response = await requests_async.get(url, stream=True)
+    with pytest.raises(requests_async.exceptions.IncompleteRead):
+        await response.save_to(str(tmp_path / "download"))
+
+
+@pytest.mark.asyncio
+async def test_download_resume(server, tmp_path):
+    path = str(tmp_path / "download")
+    url = "http://127.0.0.1:8000/download?truncate=1000&key=" + uuid.uuid4().hex
+    async with requests_async.Session() as session:
+        with pytest.raises(requests_async.exceptions.IncompleteRead):
+            await session.download(url, path)
+        assert not os.path.exists(path)
+        assert os.path.getsize(path + ".part") == 1000
+
+        response = await session.download(url, path)
+        assert response.status_code == 206
+        assert response.request.headers["Range"] == "bytes=1000-"
+
+    with open(path, "rb") as file:
+        assert file.read() == DOWNLOAD_CONTENT
+    assert os.listdir(str(tmp_path)) == ["download"]
+
+
+@pytest.mark.asyncio
+async def test_download_restarts_on_changed_file(server, tmp_path):
+    path = str(tmp_path / "download")
+    url = "http://127.0.0.1:8000/download"
+    with open(path + ".part", "wb") as file:
+        file.write(b"stale")
+    with open(path + ".part.json", "w") as file:
+        file.write('{"url": "%s", "validator": "\\"old\\""}' % url)
+
+    async with requests_async.Session() as session:
+        response = await session.download(url, path)
+        assert response.status_code == 200
+
+    with open(path, "rb") as file:
+        assert file.read() == DOWNLOAD_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_download_already_complete(server, tmp_path):
+    path = str(tmp_path / "download")
+    url = "http://127.0.0.1:8000/download"
+    with open(path + ".part", "wb") as file:
+        file.write(DOWNLOAD_CONTENT)
+    with open(path + ".part.json", "w") as file:
+        file.write('{"url": "%s", "validator": "\\"download\\""}' % url)
+
+    async with requests_async.Session() as session:
+        response = await session.download(url, path)
+        assert response.status_code == 416
+
+    with open(path, "rb") as file:
+        assert file.read() == DOWNLOAD_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_download_segments(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloads, "MIN_SEGMENT_SIZE", 64 * 1024)
+    path = str(tmp_path / "download")
+    url = "http://127.0.0.1:8000/download?truncate=1000&key=" + uuid.uuid4().hex
+    async with requests_async.Session() as session:
+        response = await session.download(url, path, segments=4)
+        assert response.request.method == "HEAD"
+
+    with open(path, "rb") as file:
+        assert file.read() == DOWNLOAD_CONTENT
+    assert os.listdir(str(tmp_path)) == ["download"]
+
+
+@pytest.mark.asyncio
+async def test_download_segments_fallback(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloads, "MIN_SEGMENT_SIZE", 64 * 1024)
+    path = str(tmp_path / "download")
+    url = "http://127.0.0.1:8000/download?ranges=ignore"
+    async with requests_async.Session() as session:
+        response = await session.download(url, path, segments=4)
+        assert response.request.method == "GET"
+        assert response.status_code == 200
+
+    with open(path, "rb") as file:
+        assert file.read() == DOWNLOAD_CONTENT
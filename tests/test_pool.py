@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import requests_async
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    async with requests_async.Session(max_connections=1, pool_timeout=0.05) as session:
+        response = await session.get(url, stream=True)
+        with pytest.raises(requests_async.PoolTimeout):
+            await session.get(url)
+        await response.close()
+        response = await session.get(url)
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_max_connections_per_host(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    async with requests_async.Session(max_connections_per_host=1) as session:
+        responses = await asyncio.gather(*[session.get(url) for _ in range(5)])
+        assert [response.status_code for response in responses] == [200] * 5
+        assert session.get_adapter(url).pool.num_connections == 1
+
+
+@pytest.mark.asyncio
+async def test_max_keepalive_per_host(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    async with requests_async.Session(pool_maxsize=2) as session:
+        responses = await asyncio.gather(*[session.get(url) for _ in range(5)])
+        assert [response.status_code for response in responses] == [200] * 5
+        assert len(session.get_adapter(url).pool.keepalive_connections) <= 2
+
+
+@pytest.mark.asyncio
+async def test_keepalive_expiry(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    async with requests_async.Session(keepalive_expiry=0.05) as session:
+        adapter = session.get_adapter(url)
+        await session.get(url)
+        assert adapter.stats()["idle"] == 1
+        await asyncio.sleep(0.1)
+        await session.get(url)
+        stats = adapter.stats()
+        assert stats["recycled"] == 1
+        assert stats["idle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_connection_age(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    async with requests_async.Session(max_connection_age=0.05) as session:
+        adapter = session.get_adapter(url)
+        response = await session.get(url, stream=True)
+        await asyncio.sleep(0.1)
+        await response.read()
+        assert adapter.stats() == {
+            "connections": 0,
+            "active": 0,
+            "idle": 0,
+            "recycled": 1,
+        }
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_closes_connection():
+    closed = asyncio.Event()
+
+    async def handle(reader, writer):
+        # Never respond, and wait for the client to hang up.
+        while await reader.read(65536):
+            pass
+        closed.set()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 8002)
+    try:
+        async with requests_async.Session() as session:
+            task = asyncio.ensure_future(session.get("http://127.0.0.1:8002/"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.wait_for(closed.wait(), 1)
+            assert session.get_adapter("http://").pool.num_connections == 0
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,77 @@
+import asyncio
+import socket
+
+import pytest
+
+import requests_async
+
+
+class CountingResolver(requests_async.Resolver):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = 0
+
+    async def lookup(self, host):
+        self.lookups += 1
+        await asyncio.sleep(0.01)
+        if host == "missing.test":
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, "127.0.0.1")]
+
+
+@pytest.mark.asyncio
+async def test_hosts_override(server):
+    resolver = requests_async.Resolver(hosts={"example.test": "127.0.0.1"})
+    url = "http://example.test:8000/"
+    async with requests_async.Session(resolver=resolver) as session:
+        response = await session.get(url)
+    assert response.json() == {"method": "GET", "url": url, "body": ""}
+
+
+@pytest.mark.asyncio
+async def test_resolve_error(server):
+    resolver = CountingResolver()
+    async with requests_async.Session(resolver=resolver) as session:
+        with pytest.raises(requests_async.ConnectionError):
+            await session.get("http://missing.test:8000/")
+
+
+@pytest.mark.asyncio
+async def test_single_flight_and_cache():
+    resolver = CountingResolver()
+    results = await asyncio.gather(
+        *[resolver.resolve("example.test") for _ in range(5)]
+    )
+    assert results == [[(socket.AF_INET, "127.0.0.1")]] * 5
+    assert await resolver.resolve("EXAMPLE.test") == [(socket.AF_INET, "127.0.0.1")]
+    assert resolver.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_negative_ttl():
+    resolver = CountingResolver(negative_ttl=60.0)
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            await resolver.resolve("missing.test")
+    assert resolver.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    resolver = CountingResolver(ttl=0.0, stale_ttl=60.0)
+    await resolver.resolve("example.test")
+    assert resolver.lookups == 1
+
+    # The stale address is returned immediately, and refreshed in the background.
+    assert await resolver.resolve("example.test") == [(socket.AF_INET, "127.0.0.1")]
+    assert "example.test" in resolver.inflight
+    await resolver.inflight["example.test"]
+    assert resolver.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_ip_literals_are_not_looked_up():
+    resolver = CountingResolver()
+    assert await resolver.resolve("127.0.0.1") == [(socket.AF_INET, "127.0.0.1")]
+    assert await resolver.resolve("[::1]") == [(socket.AF_INET6, "::1")]
+    assert resolver.lookups == 0
@@ -0,0 +1,115 @@
+import email.utils
+import io
+import time
+import uuid
+
+import pytest
+
+import requests_async
+from requests_async.retries import Retry, RetryBudget
+
+
+def flaky_url(**params):
+    params.setdefault("key", uuid.uuid4().hex)
+    query = "&".join("%s=%s" % item for item in params.items())
+    return "http://127.0.0.1:8000/flaky?" + query
+
+
+@pytest.mark.asyncio
+async def test_retry_status(server):
+    retries = Retry(total=3, backoff_factor=0, status_forcelist=[503])
+    async with requests_async.Session(max_retries=retries) as session:
+        response = await session.get(flaky_url(fail=2))
+        assert response.status_code == 200
+        assert response.text == "Attempts: 3 "
+
+        response = await session.get(flaky_url(fail=5))
+        assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_retry_after(server):
+    retries = Retry(total=1, backoff_factor=0)
+    async with requests_async.Session(max_retries=retries) as session:
+        response = await session.get(flaky_url(status=429, retry_after=0))
+        assert response.status_code == 200
+
+        response = await session.get(flaky_url(status=429))
+        assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_retry_only_idempotent_methods(server):
+    retries = Retry(total=3, backoff_factor=0, status_forcelist=[503])
+    async with requests_async.Session(max_retries=retries) as session:
+        response = await session.post(flaky_url(), data=b"data")
+        assert response.status_code == 503
+
+        response = await session.put(flaky_url(), data=b"data")
+        assert response.status_code == 200
+        assert response.text == "Attempts: 2 data"
+
+
+@pytest.mark.asyncio
+async def test_retry_rewinds_file_body(server):
+    retries = Retry(total=1, backoff_factor=0, status_forcelist=[503])
+    async with requests_async.Session(max_retries=retries) as session:
+        body = io.BytesIO(b"skip:data")
+        body.seek(5)
+        response = await session.put(flaky_url(), data=body)
+        assert response.status_code == 200
+        assert response.text == "Attempts: 2 data"
+
+
+@pytest.mark.asyncio
+async def test_retry_connection_errors(server):
+    budget = RetryBudget()
+    async with requests_async.Session(max_retries=2, retry_budget=budget) as session:
+        with pytest.raises(requests_async.ConnectError):
+            await session.get("http://127.0.0.1:8001/")
+        assert budget.retries == 2
+
+        # Requests that never reached the server are retried for any method.
+        with pytest.raises(requests_async.ConnectError):
+            await session.post("http://127.0.0.1:8001/", data=b"data")
+        assert budget.retries == 4
+
+
+@pytest.mark.asyncio
+async def test_retry_budget(server):
+    budget = RetryBudget(ratio=0.5, max_tokens=2)
+    retries = Retry(total=5, backoff_factor=0, status_forcelist=[503])
+    async with requests_async.Session(
+        max_retries=retries, retry_budget=budget
+    ) as session:
+        response = await session.get(flaky_url(fail=5))
+        assert response.status_code == 503
+        assert budget.retries == 2
+        assert budget.rejected == 1
+
+        # Each request earns back half a retry.
+        response = await session.get(flaky_url(fail=1))
+        assert response.status_code == 503
+        response = await session.get(flaky_url(fail=1))
+        assert response.status_code == 200
+        assert budget.retries == 3
+
+
+def test_backoff():
+    retries = Retry(backoff_factor=0.5, backoff_max=3)
+    for attempt in range(10):
+        delay = retries.get_backoff_time(attempt)
+        assert 0 <= delay <= min(3, 0.5 * 2**attempt)
+
+
+def test_retry_after_header():
+    retries = Retry(backoff_max=300)
+    assert retries.get_retry_after({}) is None
+    assert retries.get_retry_after({"retry-after": "120"}) == 120
+    assert retries.get_retry_after({"retry-after": "86400"}) == 300
+    assert retries.get_retry_after({"retry-after": "soon"}) is None
+    date = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < retries.get_retry_after({"retry-after": date}) <= 60
+    assert not Retry(respect_retry_after_header=False).get_retry_after(
+        {"retry-after": "120"}
+    )
@@ -50,3 +50,46 @@ async def test_session_redirection_disallowed(server):
         response = await session.send(response.next, allow_redirects=False)
         assert response.status_code == 200
         assert response.url == "http://127.0.0.1:8000/redirect3"
+
+
+@pytest.mark.asyncio
+async def test_session_map(server):
+    url = "http://127.0.0.1:8000/"
+    items = [
+        {"method": "GET", "url": url, "params": {"n": "0"}},
+        requests_async.Request("POST", url, data="abc"),
+        {"method": "GET", "url": "http://127.0.0.1:1/"},
+        requests_async.Request("GET", url + "hello_world").prepare(),
+    ]
+    async with requests_async.Session() as session:
+        results = await session.map(items, concurrency=2)
+
+    assert len(results) == 4
+    assert results[0].json() == {"method": "GET", "url": url + "?n=0", "body": ""}
+    assert results[1].json() == {"method": "POST", "url": url, "body": "abc"}
+    assert isinstance(results[2], requests_async.ConnectionError)
+    assert results[3].text == "Hello, world!"
+
+
+@pytest.mark.asyncio
+async def test_session_as_completed(server):
+    url = "http://127.0.0.1:8000/"
+    in_flight = 0
+    max_in_flight = 0
+
+    async def items():
+        nonlocal in_flight, max_in_flight
+        for index in range(10):
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            yield {"method": "GET", "url": url, "params": {"n": str(index)}}
+
+    seen = set()
+    async with requests_async.Session() as session:
+        async for index, response in session.as_completed(items(), concurrency=3):
+            in_flight -= 1
+            assert response.json()["url"] == url + "?n=%d" % index
+            seen.add(index)
+
+    assert seen == set(range(10))
+    assert max_in_flight <= 4
@@ -1,8 +1,13 @@
+import array
 import asyncio
+import io
+import mmap
+import tempfile
 
 import pytest
 
 import requests_async
+from requests_async.models import UPLOAD_CHUNK_SIZE, LineSplitter, rechunk, stream_body
 
 
 @pytest.mark.asyncio
@@ -106,3 +111,191 @@ async def test_stream_request(server):
     response = await requests_async.post(url, data=stream())
     assert response.status_code == 200
     assert response.json() == {"method": "POST", "url": url, "body": "example"}
+
+
+@pytest.mark.asyncio
+async def test_readinto_on_stream(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url, stream=True)
+    assert response.status_code == 200
+    buffer = bytearray(5)
+    parts = []
+    while True:
+        count = await response.readinto(buffer)
+        if not count:
+            break
+        parts.append(bytes(buffer[:count]))
+    assert parts == [b"Hello", b", wor", b"ld!"]
+
+
+@pytest.mark.asyncio
+async def test_readinto_on_content(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url)
+    assert response.status_code == 200
+    buffer = bytearray(64)
+    count = await response.readinto(memoryview(buffer)[8:])
+    assert bytes(buffer[8 : 8 + count]) == b"Hello, world!"
+    assert await response.readinto(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_read_after_readinto(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url, stream=True)
+    assert response.status_code == 200
+    buffer = bytearray(7)
+    assert await response.readinto(buffer) == 7
+    assert await response.read() == b"world!"
+
+
+@pytest.mark.asyncio
+async def test_iter_content_chunk_size(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url, stream=True)
+    chunks = [chunk async for chunk in response.iter_content(chunk_size=5)]
+    assert chunks == [b"Hello", b", wor", b"ld!"]
+
+
+@pytest.mark.asyncio
+async def test_iter_content_without_chunk_size(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url, stream=True)
+    chunks = [chunk async for chunk in response.iter_content(chunk_size=None)]
+    assert chunks == [b"Hello, world!"]
+
+
+@pytest.mark.asyncio
+async def test_iter_content_max_chunk(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url)
+    chunks = [
+        chunk async for chunk in response.iter_content(chunk_size=None, max_chunk=4)
+    ]
+    assert chunks == [b"Hell", b"o, w", b"orld", b"!"]
+
+
+@pytest.mark.asyncio
+async def test_iter_buffers(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url, stream=True)
+    chunks = [chunk async for chunk in response.iter_buffers(chunk_size=8)]
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert [bytes(chunk) for chunk in chunks] == [b"Hello, w", b"orld!"]
+
+
+@pytest.mark.asyncio
+async def test_rechunk_across_parts():
+    async def parts():
+        for part in [b"ab", b"c", b"defgh", b"", b"ijklmnop", b"q"]:
+            yield part
+
+    chunks = [bytes(chunk) async for chunk in rechunk(parts(), chunk_size=3)]
+    assert chunks == [b"abc", b"def", b"ghi", b"jkl", b"mno", b"pq"]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_max_line_length(server):
+    url = "http://127.0.0.1:8000/hello_world"
+    response = await requests_async.get(url, stream=True)
+    assert response.status_code == 200
+    with pytest.raises(requests_async.exceptions.LineTooLong):
+        async for line in response.iter_lines(chunk_size=4, max_line_length=5):
+            pass
+
+
+@pytest.mark.parametrize(
+    "chunks,delimiter,expected",
+    [
+        ([b"ab", b"b\nbb", b"b"], None, [b"abb", b"bbb"]),
+        ([b"a\r", b"\nb\r", b"c"], None, [b"a", b"b", b"c"]),
+        ([b"a\r\n", b"\n"], None, [b"a", b""]),
+        ([b"one--", b"-two-", b"--three"], b"---", [b"one", b"two", b"three"]),
+        (["x;", ";y;;"], ";;", ["x", "y", ""]),
+    ],
+)
+def test_line_splitter(chunks, delimiter, expected):
+    splitter = LineSplitter(delimiter)
+    lines = []
+    for chunk in chunks:
+        lines.extend(splitter.split(chunk))
+    lines.extend(splitter.flush())
+    assert lines == expected
+
+
+@pytest.mark.asyncio
+async def test_stream_request_content_type(server):
+    url = "http://127.0.0.1:8000/echo_headers"
+
+    async def stream():
+        yield b"example"
+
+    response = await requests_async.post(url, data=stream())
+    headers = response.json()["headers"]
+    assert headers["transfer-encoding"] == "chunked"
+    assert "content-type" not in headers
+
+
+@pytest.mark.asyncio
+async def test_stream_request_from_buffers(server):
+    url = "http://127.0.0.1:8000/"
+    data = b"x" * (UPLOAD_CHUNK_SIZE * 2 + 1)
+    with tempfile.TemporaryFile() as file:
+        file.write(data)
+        file.flush()
+        with mmap.mmap(file.fileno(), 0) as buffer:
+            for body in (memoryview(data), bytearray(data), buffer):
+                response = await requests_async.put(url, data=body)
+                assert response.json()["body"] == data.decode()
+
+
+@pytest.mark.asyncio
+async def test_stream_request_from_files(server):
+    url = "http://127.0.0.1:8000/"
+    data = b"x" * (UPLOAD_CHUNK_SIZE * 2 + 1)
+
+    class AsyncFile:
+        def __init__(self, data):
+            self.file = io.BytesIO(data)
+
+        async def read(self, size=-1):
+            return self.file.read(size)
+
+    response = await requests_async.put(url, data=io.BytesIO(data))
+    assert response.json()["body"] == data.decode()
+
+    response = await requests_async.put(url, data=AsyncFile(data))
+    assert response.json()["body"] == data.decode()
+
+
+@pytest.mark.asyncio
+async def test_stream_request_from_iterator(server):
+    url = "http://127.0.0.1:8000/"
+    response = await requests_async.put(url, data=iter([b"e", "xample"]))
+    assert response.json()["body"] == "example"
+
+
+@pytest.mark.asyncio
+async def test_stream_body_chunks():
+    data = bytearray(b"abcdefg")
+    chunks = [chunk async for chunk in stream_body(data, chunk_size=3)]
+    assert [bytes(chunk) for chunk in chunks] == [b"abc", b"def", b"g"]
+    assert all(chunk.obj is data for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_stream_request_from_multibyte_buffer(server):
+    url = "http://127.0.0.1:8000/"
+    data = array.array("I", [0x41424344] * 4)
+    response = await requests_async.put(url, data=memoryview(data))
+    assert response.json()["body"] == data.tobytes().decode()
+
+
+@pytest.mark.asyncio
+async def test_stream_request_longer_than_content_length(server):
+    url = "http://127.0.0.1:8000/"
+    request = requests_async.Request("PUT", url, data=b"data").prepare()
+    request.body = iter([b"too much data"])
+    async with requests_async.Session() as session:
+        with pytest.raises(requests_async.exceptions.ConnectionError):
+            await session.send(request)